@@ -0,0 +1,176 @@
+#  Copyright (c) Kuba Szczodrzyński 2026-10-19.
+
+import json
+import platform
+import sys
+from dataclasses import asdict, replace
+from os.path import abspath, dirname, join
+from statistics import median
+from tempfile import TemporaryDirectory
+from time import perf_counter
+from typing import Callable
+
+import click
+
+sys.path.insert(0, dirname(dirname(abspath(__file__))))
+
+from synthetic import SyntheticParams, build_presets, generate_board  # noqa
+
+from boardgen import Core  # noqa: E402
+from boardgen.draw_util import draw_shapes, get_pcb_images, svg_to_string  # noqa
+from boardgen.models import Side  # noqa: E402
+from boardgen.readme import ReadmeWriter  # noqa: E402
+from boardgen.variant import VariantWriter  # noqa: E402
+from boardgen.vector import V  # noqa: E402
+
+DEFAULTS = SyntheticParams()
+# each sweep varies one parameter, keeping the others at their defaults
+SWEEPS = {
+    "pins": [16, 64, 256],
+    "depth": [1, 4, 8],
+    "repeat": [0, 200, 1000],
+    "vars": [10, 100, 1000],
+    "presets": [10, 100, 1000],
+    "bases": [1, 8, 32],
+}
+STAGES = [
+    "get_board",
+    "build_labels",
+    "draw_shapes",
+    "serialize",
+    "readme",
+    "variant",
+]
+
+
+def measure(func: Callable[[], object], runs: int) -> dict[str, float]:
+    times = []
+    for _ in range(runs):
+        start = perf_counter()
+        func()
+        times.append(perf_counter() - start)
+    return dict(min=min(times), median=median(times))
+
+
+def run_case(core: Core, name: str, runs: int) -> dict[str, dict[str, float]]:
+    """Time each pipeline stage of an already generated board."""
+
+    def get_board():
+        # JSON files stay cached; the board is rebuilt (bases merged, etc.)
+        core.remove_from_cache("board_objs", name)
+        return core.get_board(name)
+
+    board = get_board()
+    pcb = board.pcb
+    images = get_pcb_images(core, pcb, True)
+    px_size = V(1024, 500)
+    scale = 12 if pcb.scale is None else pcb.scale
+    dwg = draw_shapes(px_size, scale, images, True)
+
+    funcs = {
+        "get_board": get_board,
+        "build_labels": lambda: core.build_labels(pcb, Side.FRONT),
+        "draw_shapes": lambda: draw_shapes(px_size, scale, images, True),
+        "serialize": lambda: svg_to_string(dwg),
+        "readme": lambda: ReadmeWriter(core).write(board=board),
+        "variant": lambda: VariantWriter(core).generate(board=board),
+    }
+    return {stage: measure(funcs[stage], runs) for stage in STAGES}
+
+
+def compare(results: dict, baseline: dict, tolerance: float, floor: float) -> int:
+    """Print stages slower than the baseline; return the number of regressions."""
+    regressions = 0
+    for case, stages in results["cases"].items():
+        base_stages = baseline["cases"].get(case, {})
+        for stage, result in stages.items():
+            if stage not in base_stages:
+                continue
+            # the fastest run is the least noisy
+            now = result["min"]
+            then = base_stages[stage]["min"]
+            if now - then < floor or now <= then * (1 + tolerance):
+                continue
+            click.echo(
+                f"REGRESSION {case} / {stage}: "
+                f"{then * 1000:.2f} ms -> {now * 1000:.2f} ms "
+                f"({(now / then - 1) * 100:+.0f}%)"
+            )
+            regressions += 1
+    return regressions
+
+
+@click.command()
+@click.option("--runs", "-n", default=5, help="Runs of each stage")
+@click.option(
+    "--sweep",
+    "-s",
+    "sweeps",
+    type=click.Choice(list(SWEEPS)),
+    multiple=True,
+    help="Parameters to sweep (default all)",
+)
+@click.option("--output", "-o", help="Save results to a JSON file")
+@click.option("--baseline", "-b", help="Compare with results saved earlier")
+@click.option("--tolerance", "-t", default=0.25, help="Allowed slowdown (ratio)")
+@click.option("--floor", default=0.0005, help="Ignore slowdowns under (seconds)")
+def pipeline(
+    runs: int,
+    sweeps: list[str],
+    output: str,
+    baseline: str,
+    tolerance: float,
+    floor: float,
+):
+    """Time the build pipeline on synthetic boards of growing size"""
+    core = Core()
+    cases: dict[str, SyntheticParams] = {}
+    for param in sweeps or SWEEPS:
+        for value in SWEEPS[param]:
+            params = replace(DEFAULTS, **{param: value})
+            cases[f"{param}={value}"] = params
+
+    results = dict(
+        python=platform.python_version(),
+        boardgen=core.version,
+        runs=runs,
+        cases={},
+        params={},
+    )
+    with TemporaryDirectory(prefix="boardgen-bench-") as root:
+        core.add_custom_dirs(
+            boards=join(root, "boards"),
+            shapes=join(root, "shapes"),
+            templates=join(root, "templates"),
+        )
+        for case, params in cases.items():
+            name = generate_board(root, params)
+            # start each case with only its own presets
+            core.clear_cache()
+            core.add_custom_json(presets=build_presets(params))
+            click.echo(f"{case}: ", nl=False)
+            stages = run_case(core, name, runs)
+            click.echo(
+                ", ".join(
+                    f"{stage} {result['median'] * 1000:.2f} ms"
+                    for stage, result in stages.items()
+                )
+            )
+            results["cases"][case] = stages
+            results["params"][case] = asdict(params)
+
+    if output:
+        with open(output, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent="\t")
+        click.echo(f"Saved results to '{output}'")
+    if baseline:
+        with open(baseline, "r", encoding="utf-8") as f:
+            regressions = compare(results, json.load(f), tolerance, floor)
+        if regressions:
+            click.echo(f"{regressions} stage(s) slower than the baseline")
+            exit(1)
+        click.echo("No regressions against the baseline")
+
+
+if __name__ == "__main__":
+    pipeline()
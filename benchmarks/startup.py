@@ -0,0 +1,91 @@
+#  Copyright (c) Kuba Szczodrzyński 2026-10-19.
+
+import os
+import subprocess
+import sys
+from os.path import abspath, dirname
+from statistics import median
+from time import perf_counter
+
+import click
+
+ROOT = dirname(dirname(abspath(__file__)))
+# modules which lightweight commands (i.e. 'list shapes') must not import
+HEAVY_MODULES = [
+    "pydantic",
+    "svgwrite",
+    "devtools",
+    "natsort",
+    "markdown2",
+    "boardgen.models",
+    "boardgen.shapes",
+    "boardgen.readme",
+    "boardgen.variant",
+]
+
+
+def get_env() -> dict[str, str]:
+    env = dict(os.environ)
+    env["PYTHONPATH"] = os.pathsep.join(filter(None, [ROOT, env.get("PYTHONPATH")]))
+    return env
+
+
+def measure(argv: list[str], runs: int) -> float:
+    """Return the median wall time of running the command."""
+    times = []
+    for _ in range(runs):
+        start = perf_counter()
+        subprocess.run(argv, env=get_env(), capture_output=True, check=True)
+        times.append(perf_counter() - start)
+    return median(times)
+
+
+def get_imported_modules(argv: list[str]) -> set[str]:
+    argv = [argv[0], "-X", "importtime", *argv[1:]]
+    result = subprocess.run(argv, env=get_env(), capture_output=True, text=True)
+    modules = set()
+    for line in result.stderr.splitlines():
+        if line.startswith("import time:") and "|" in line:
+            modules.add(line.rpartition("|")[2].strip())
+    return modules
+
+
+@click.command()
+@click.option("--runs", "-n", default=20, help="Number of invocations")
+@click.option("--budget", "-b", default=0.2, help="Maximum median time (seconds)")
+@click.option(
+    "--check-imports/--no-check-imports",
+    default=True,
+    help="Fail if heavy modules are imported",
+)
+@click.argument("args", nargs=-1)
+def startup(runs: int, budget: float, check_imports: bool, args: list[str]):
+    """Measure CLI startup time (of 'list shapes' by default)"""
+    args = list(args) or ["list", "shapes"]
+    argv = [sys.executable, "-m", "boardgen", *args]
+    # warm up the filesystem cache and .pyc files
+    measure(argv, 1)
+    took = measure(argv, runs)
+    bare = measure([sys.executable, "-c", "pass"], runs)
+    click.echo(f"'boardgen {' '.join(args)}': {took * 1000:.1f} ms (median)")
+    click.echo(f"Bare interpreter: {bare * 1000:.1f} ms (median)")
+
+    failed = False
+    heavy = sorted(
+        name
+        for name in get_imported_modules(argv)
+        if any(name == mod or name.startswith(f"{mod}.") for mod in HEAVY_MODULES)
+    )
+    if check_imports and heavy:
+        click.echo(f"Heavy modules imported: {', '.join(heavy)}")
+        failed = True
+    if took > budget:
+        click.echo(f"Over budget of {budget * 1000:.0f} ms")
+        failed = True
+    if failed:
+        exit(1)
+    click.echo("OK")
+
+
+if __name__ == "__main__":
+    startup()
@@ -0,0 +1,196 @@
+#  Copyright (c) Kuba Szczodrzyński 2026-10-19.
+
+import json
+import os
+from dataclasses import asdict, dataclass
+from os.path import join
+
+# roles cycled through the generated pinout
+ROLE_CYCLE = [
+    dict(UART=["1_TX"]),
+    dict(UART=["1_RX"]),
+    dict(I2C=["0_SDA"]),
+    dict(I2C=["0_SCL"]),
+    dict(SPI=["0_MOSI"]),
+    dict(ADC=1),
+    dict(),
+]
+
+
+@dataclass(frozen=True)
+class SyntheticParams:
+    """Size parameters of a synthetic board."""
+
+    # pads (and pinout entries), split between two columns
+    pins: int = 32
+    # include levels between a pin and its copper shapes
+    depth: int = 2
+    # decorative shapes added with a single repeated include
+    repeat: int = 0
+    # template variables
+    vars: int = 10
+    # custom presets, cycled through by the pins
+    presets: int = 10
+    # board base manifests (at least one)
+    bases: int = 1
+
+    @property
+    def name(self) -> str:
+        return "synth_" + "_".join(f"{k}{v}" for k, v in asdict(self).items())
+
+
+def write_json(path: str, data: dict | list) -> None:
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(data, f, indent="\t")
+
+
+def build_presets(params: SyntheticParams) -> dict[str, dict]:
+    return {
+        f"synth{i}": dict(
+            fill=dict(color=f"#{(i * 0x10101) % 0xFFFFFF:06X}"),
+            stroke=dict(color="#B5A739", width=0.05),
+        )
+        for i in range(params.presets)
+    }
+
+
+def generate_board(root: str, params: SyntheticParams) -> str:
+    """Write a synthetic board, its template, shapes and bases to root.
+
+    Use root's boards/, templates/ and shapes/ as custom Core directories,
+    and build_presets() as custom presets.
+
+    Returns:
+        str: Board name.
+    """
+    name = params.name
+    rows = (params.pins + 1) // 2
+
+    # a chain of includes, ending with the copper shapes
+    for level in range(params.depth):
+        if level < params.depth - 1:
+            shape = [dict(id=f"n{level}", name=f"{name}_nest{level + 1}", pos="0,0")]
+        else:
+            shape = [
+                dict(
+                    id="trace",
+                    type="rect",
+                    pos="<${PINDIR} : right : -0.7 : 0> , -0.6",
+                    size="0.7 + 0 * ${SV0} , 1.2",
+                    preset=f"synth<(${{PIN}}) % {params.presets}>",
+                ),
+                dict(
+                    id="cast",
+                    type="circle",
+                    pos="0,0",
+                    d="0.7",
+                    fill=dict(color="white"),
+                ),
+            ]
+        write_json(join(root, "shapes", f"{name}_nest{level}.json"), shape)
+
+    write_json(
+        join(root, "shapes", f"{name}_pins.json"),
+        [
+            dict(
+                id="pin<${I} + 1>",
+                name=f"{name}_nest0",
+                pos="0 , 2 * ${I}",
+                label_dir="${PINDIR}",
+                label_size="2",
+                vars=dict(PIN="${I} + ${PINOFFS}"),
+            )
+        ],
+    )
+    write_json(
+        join(root, "shapes", f"{name}_dot.json"),
+        [
+            dict(
+                type="circle",
+                pos="1 + <${I} % 20> * 0.5 , 1 + <${I} // 20> * 0.5",
+                d="0.2",
+                fill=dict(color="#808080"),
+            )
+        ],
+    )
+
+    height = 2 * rows + 4
+    columns = [
+        dict(id="left", pos="0,3", PINDIR="left", PINOFFS=0),
+        dict(id="right", pos="16,3", PINDIR="right", PINOFFS=rows),
+    ]
+    front = [
+        dict(type="rect", pos="0,0", size=f"16,{height}", preset="${MASK_PRESET}"),
+    ]
+    for column in columns:
+        front.append(
+            dict(
+                id=column["id"],
+                name=f"{name}_pins",
+                repeat=rows,
+                pos=column["pos"],
+                vars=dict(PINDIR=column["PINDIR"], PINOFFS=column["PINOFFS"]),
+            )
+        )
+    if params.repeat:
+        front.append(dict(name=f"{name}_dot", repeat=params.repeat, pos="0,0"))
+
+    pads = {}
+    for i in range(params.pins):
+        column = columns[0] if i < rows else columns[1]
+        pads[str(i + 1)] = f"{name}.front.{column['id']}.pin{i % rows + 1}"
+
+    write_json(
+        join(root, "templates", f"{name}.json"),
+        dict(
+            name=name,
+            title=f"Synthetic template ({name})",
+            width=16,
+            height=height,
+            vars={"MASK_PRESET": "mask_black"}
+            | {f"SV{i}": i for i in range(max(params.vars, 1))},
+            front=front,
+            back=[front[0]],
+            pads=pads,
+        ),
+    )
+
+    bases = []
+    for i in range(max(params.bases, 1)):
+        base = f"{name}_{i}"
+        write_json(
+            join(root, "boards", "_base", f"{base}.json"),
+            dict(
+                build=dict(f_cpu="120000000L", family="SYNTH", mcu=f"synth{i}"),
+                upload=dict(
+                    flash_size=2097152,
+                    maximum_ram_size=262144,
+                    maximum_size=1048576,
+                ),
+                connectivity=["wifi"],
+                flash={
+                    "bootloader": "0x000000+0x10000",
+                    "app": f"0x010000+0x{0x100000 + i * 0x1000:X}",
+                },
+                doc=dict(params=dict(manufacturer="Synthetic", series=f"S{i}")),
+            ),
+        )
+        bases.append(base)
+
+    pinout = {}
+    for i in range(params.pins):
+        roles = dict(GPIO=f"P{i}", ARD=[f"D{i}"])
+        roles |= ROLE_CYCLE[i % len(ROLE_CYCLE)]
+        pinout[str(i + 1)] = roles
+    write_json(
+        join(root, "boards", f"{name}.json"),
+        dict(
+            _base=bases,
+            build=dict(variant=name),
+            name=f"Synthetic board ({name})",
+            vendor="Synthetic",
+            pcb=dict(symbol="SYNTH", templates=[name, "pcb-black"], pinout=pinout),
+        ),
+    )
+    return name
@@ -2,16 +2,38 @@
 
 import os
 import sys
+from importlib import import_module
 
 while os.getcwd() in sys.path:
     sys.path.remove(os.getcwd())
 
-from . import models, shapes, utils
-from .core import Core
-from .mixins import HasId, HasVars, ParentType
-from .readme import ReadmeWriter
-from .variant import VariantWriter
-from .vector import V
+# imported on first access, so that the CLI starts quickly
+_lazy_attrs = {
+    "models": (".models", None),
+    "shapes": (".shapes", None),
+    "utils": (".utils", None),
+    "Core": (".core", "Core"),
+    "HasVars": (".mixins", "HasVars"),
+    "HasId": (".mixins", "HasId"),
+    "ParentType": (".mixins", "ParentType"),
+    "V": (".vector", "V"),
+    "ReadmeWriter": (".readme", "ReadmeWriter"),
+    "IndexWriter": (".readme", "IndexWriter"),
+    "VariantWriter": (".variant", "VariantWriter"),
+    "BoardGenerator": (".generate", "BoardGenerator"),
+}
+
+
+def __getattr__(name: str):
+    if name not in _lazy_attrs:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    module_name, attr = _lazy_attrs[name]
+    value = import_module(module_name, __name__)
+    if attr:
+        value = getattr(value, attr)
+    globals()[name] = value
+    return value
+
 
 __all__ = [
     "models",
@@ -23,5 +45,7 @@ __all__ = [
     "ParentType",
     "V",
     "ReadmeWriter",
+    "IndexWriter",
     "VariantWriter",
+    "BoardGenerator",
 ]
@@ -1,24 +1,39 @@
 # Copyright (c) Kuba Szczodrzyński 2022-05-09.
 
+import json
 import os
-from os.path import isfile, join
+from functools import wraps
+from io import StringIO
+from os.path import abspath, dirname, isdir, isfile, join
+from typing import TYPE_CHECKING, Callable, Generator
 
 import click
 from click import echo
-from devtools import debug
 
-from . import Core
-from .draw_util import draw_shapes, get_pcb_images
-from .models import Board, Template
-from .readme.writer import ReadmeWriter
+from .core import Core
+from .generate import BoardGenerator
+from .lock import LOCK_FILE, BuildLock
+from .output import (
+    ALL_OUTPUTS,
+    VARIANT_OUTPUTS,
+    OutputWriter,
+    get_output_path,
+    hash_content,
+)
 from .utils import load_json
-from .variant.writer import VariantWriter
 from .vector import V
+from .watch import FileWatcher, get_json_keys
+
+# modules which pull in pydantic/svgwrite are imported by the commands
+# that need them, to keep the startup time short
+if TYPE_CHECKING:
+    from .models import Board
 
 core = Core()
+generator = BoardGenerator(core, log=echo)
 
 
-def load_boards(boards: list[str | Board]) -> list[Board]:
+def load_boards(boards: list["str | Board"]) -> list["Board"]:
     if not boards:
         return boards
     if isinstance(boards[0], str):
@@ -31,6 +46,60 @@ def load_boards(boards: list[str | Board]) -> list[Board]:
     return boards
 
 
+def iter_boards(boards: list["str | Board"]) -> Generator["Board", None, None]:
+    """Like load_boards(), but builds each board only when it's needed."""
+    if boards and isinstance(boards[0], str) and boards[0] == "all":
+        boards = sorted(core.list_json("boards"))
+    for board in boards:
+        if isinstance(board, str):
+            echo(f"Loading board '{board}'...")
+            board = core.get_board(board)
+        yield board
+
+
+def get_output_name(path: str) -> str | None:
+    """Find the output name of a path saved by get_output_path()."""
+    ext = path.rpartition(".")[2]
+    return {
+        "svg": "svg",
+        "png": "png",
+        "md": "readme",
+        "h": "variant_h",
+        "c": "variant_c",
+    }.get(ext, None)
+
+
+def board_selection(default_all: bool = False) -> Callable:
+    """Add a BOARDS argument and metadata selectors to a command.
+
+    The command receives a list of board names (or ["all"]).
+    """
+
+    def decorator(func: Callable) -> Callable:
+        @click.argument("boards", nargs=-1)
+        @click.option("--match", multiple=True, help="Select boards by name (glob)")
+        @click.option("--family", multiple=True, help="Select boards by family")
+        @click.option("--vendor", multiple=True, help="Select boards by vendor")
+        @click.option("--mcu", multiple=True, help="Select boards by MCU")
+        @wraps(func)
+        def wrapper(*args, boards, match, family, vendor, mcu, **kwargs):
+            if match or family or vendor or mcu:
+                names = None if not boards or "all" in boards else list(boards)
+                boards = core.find_boards(names, match, family, vendor, mcu)
+                if not boards:
+                    echo("No boards match the selectors")
+                    return
+            elif not boards:
+                if not default_all:
+                    raise click.UsageError("Specify board names, 'all' or selectors")
+                boards = ["all"]
+            return func(*args, boards=list(boards), **kwargs)
+
+        return wrapper
+
+    return decorator
+
+
 @click.group(help=f"boardgen CLI v{core.version}")
 @click.option("--boards", type=str, multiple=True, help="Custom boards directories")
 @click.option("--shapes", type=str, multiple=True, help="Custom shapes directories")
@@ -40,6 +109,9 @@ def load_boards(boards: list[str | Board]) -> list[Board]:
 @click.option("--presets", type=str, multiple=True, help="Custom presets .json")
 @click.option("--roles", type=str, multiple=True, help="Custom roles .json")
 @click.option("--flash", type=str, multiple=True, help="Custom flash regions .json")
+@click.option("--profile", is_flag=True, help="Print time spent in build stages")
+@click.option("--pstats", type=str, help="Save cProfile stats to a file (--profile)")
+@click.option("--trace", type=str, help="Save a Chrome trace .json (--profile)")
 def cli(
     boards: tuple[str],
     shapes: tuple[str],
@@ -47,15 +119,50 @@ def cli(
     presets: tuple[str],
     roles: tuple[str],
     flash: tuple[str],
+    profile: bool,
+    pstats: str,
+    trace: str,
     *args,
     **kwargs,
 ):
-    print(f"boardgen CLI v{core.version}")
+    # keep stdout clean for machine-readable output
+    echo(f"boardgen CLI v{core.version}", err=True)
     core.add_custom_dirs(
         boards=list(boards),
         shapes=list(shapes),
         templates=list(templates),
     )
+    load_custom_json(presets, roles, flash)
+    if profile or pstats or trace:
+        start_profiling(pstats, trace)
+
+
+def start_profiling(pstats: str | None, trace: str | None) -> None:
+    from .profiler import Profiler
+
+    core.profiler = Profiler()
+    cprofile = None
+    if pstats:
+        from cProfile import Profile
+
+        cprofile = Profile()
+        cprofile.enable()
+
+    def finish() -> None:
+        if cprofile:
+            cprofile.disable()
+            cprofile.dump_stats(pstats)
+            echo(f"Saved profiler stats to '{pstats}'", err=True)
+        if trace:
+            core.profiler.save_trace(trace)
+            echo(f"Saved trace to '{trace}'", err=True)
+        # keep stdout clean for machine-readable output
+        echo(core.profiler.summary, err=True)
+
+    click.get_current_context().call_on_close(finish)
+
+
+def load_custom_json(presets: tuple[str], roles: tuple[str], flash: tuple[str]):
     presets_data = {}
     roles_data = {}
     flash_data = {}
@@ -65,11 +172,16 @@ def cli(
         roles_data |= load_json(file)
     for file in flash:
         flash_data |= load_json(file)
-    core.add_custom_json(presets=presets_data, roles=roles_data, flash=flash_data)
+    core.add_custom_json(
+        presets=presets_data,
+        roles=roles_data,
+        flash=flash_data,
+        files=list(presets + roles + flash),
+    )
 
 
 @cli.command()
-@click.argument("boards", nargs=-1, required=True)
+@board_selection()
 @click.option("--dump", "-d", is_flag=True, help="Dump board info and exit")
 @click.option("--output", "-o", default=".", help="Output directory")
 @click.option("--subdir", "-O", is_flag=True, help="Output into per-board subdirectory")
@@ -89,6 +201,34 @@ def cli(
     help="Draw a white background with black border",
 )
 @click.option("--labels/--no-labels", "-l/-L", default=True, help="Draw pin labels")
+@click.option(
+    "--layers/--no-layers",
+    default=False,
+    help="Group shapes into named layers, sharing repeated label symbols",
+)
+@click.option(
+    "--format",
+    "-f",
+    "formats",
+    type=click.Choice(["svg", "png"]),
+    multiple=True,
+    default=["svg"],
+    help="Output format(s); may be given multiple times",
+)
+@click.option(
+    "--jobs",
+    "-j",
+    default=None,
+    type=int,
+    help="PNG rasterizer thread count (default: automatic)",
+)
+@click.option(
+    "--tiles",
+    "-t",
+    default=0,
+    help="Also export tiles at this many zoom levels (0 to disable)",
+)
+@click.option("--tile-size", default=256, help="Tile size (px)")
 @click.pass_context
 def draw(
     ctx,
@@ -101,10 +241,26 @@ def draw(
     scale: float,
     canvas: bool,
     labels: bool,
+    layers: bool,
+    formats: list[str],
+    jobs: int,
+    tiles: int,
+    tile_size: int,
 ):
     """Draw board diagrams"""
+    from .draw_util import (
+        draw_shapes,
+        draw_tiles,
+        get_pcb_images,
+        get_pcb_pads,
+        svg_to_string,
+    )
+    from .raster import Rasterizer
+
     boards = load_boards(boards)
     if dump:
+        from devtools import debug
+
         for board in boards:
             debug(board)
         ctx.exit()
@@ -115,6 +271,13 @@ def draw(
         os.makedirs(output, exist_ok=True)
 
     scale_arg = scale
+    files = OutputWriter()
+    rasterizer = None
+    if "png" in formats:
+        try:
+            rasterizer = Rasterizer(jobs, save=files.write)
+        except RuntimeError as e:
+            raise click.ClickException(str(e))
 
     for board in boards:
         board: Board
@@ -122,7 +285,8 @@ def draw(
             echo(f"Skipping '{board.name}'...")
             continue
         svg = join(output, f"{board.id}.svg")
-        echo(f"Drawing '{board.name}' as '{svg}'...")
+        png = join(output, f"{board.id}.png")
+        echo(f"Drawing '{board.name}' as '{svg if 'svg' in formats else png}'...")
 
         pcb = board.pcb
 
@@ -134,18 +298,119 @@ def draw(
         else:
             scale = scale_arg
 
-        images = get_pcb_images(core, pcb, labels)
-        dwg = draw_shapes(px_size, scale, images, canvas)
+        with core.stage("draw", board=board.id):
+            images = get_pcb_images(core, pcb, labels)
+            dwg = draw_shapes(
+                px_size,
+                scale,
+                images,
+                canvas,
+                layered=layers,
+                pads=get_pcb_pads(pcb),
+            )
 
         if subdir:
             os.makedirs(join(output, board.id), exist_ok=True)
             svg = join(output, board.id, f"{board.id}.svg")
-        with open(svg, "w", encoding="utf-8") as f:
-            dwg.write(f, pretty=True, indent=4)
+            png = join(output, board.id, f"{board.id}.png")
+        if "svg" in formats:
+            with core.stage("serialize"):
+                content = svg_to_string(dwg)
+            generator.save_file(files, svg, content)
+        if rasterizer:
+            rasterizer.submit(dwg, px_size, png)
+
+        if tiles:
+            tiles_dir = join(output, f"{board.id}_tiles")
+            if subdir:
+                tiles_dir = join(output, board.id, "tiles")
+            echo(f"Drawing {tiles} zoom levels to '{tiles_dir}'...")
+            for level, x, y, tile in draw_tiles(
+                px_size,
+                scale,
+                images,
+                canvas,
+                levels=tiles,
+                tile_size=tile_size,
+                test_pads=set(pcb.test_pads.values()),
+            ):
+                tile_path = join(tiles_dir, str(level), str(x), str(y))
+                if "svg" in formats:
+                    files.write(f"{tile_path}.svg", svg_to_string(tile, pretty=False))
+                if rasterizer:
+                    rasterizer.submit(tile, V(tile_size, tile_size), f"{tile_path}.png")
+
+    if rasterizer:
+        rasterizer.close()
+    echo(f"Output files: {files.summary}")
+
+
+@cli.command()
+@board_selection()
+@click.option(
+    "--output",
+    "-o",
+    default="gallery.svg",
+    help="Output file (.svg or .html)",
+)
+@click.option("--columns", "-c", default=4, help="Number of grid columns")
+@click.option("--width", "-w", default=320, help="Cell width (px)")
+@click.option("--height", "-h", default=240, help="Cell height (px)")
+@click.option("--labels/--no-labels", "-l/-L", default=False, help="Draw pin labels")
+@click.option(
+    "--link",
+    default="{id}.md",
+    help="Board link format, '{id}' is the board code; empty to disable",
+)
+def gallery(
+    boards: list[str],
+    output: str,
+    columns: int,
+    width: int,
+    height: int,
+    labels: bool,
+    link: str,
+):
+    """Draw an overview sheet of board diagrams"""
+    from .draw_util import draw_gallery, get_pcb_images, svg_to_string
+
+    boards = load_boards(boards)
+
+    items = []
+    for board in sorted(boards, key=lambda b: b.id):
+        board: Board
+        if not board.pcb or not board.pcb.templates:
+            echo(f"Skipping '{board.name}'...")
+            continue
+        images = get_pcb_images(core, board.pcb, labels)
+        if not images:
+            continue
+        href = link.format(id=board.id) if link else None
+        # front side only
+        items.append((board.name, href, images[0]))
+
+    dwg = draw_gallery(V(width, height), columns, items)
+
+    if output.endswith(".html"):
+        content = "\n".join(
+            [
+                "<!DOCTYPE html>",
+                '<html><head><meta charset="utf-8"><title>Boards</title></head><body>',
+                dwg.tostring(),
+                "</body></html>",
+                "",
+            ]
+        )
+    else:
+        content = svg_to_string(dwg)
+    echo(f"Saving {len(items)} boards to '{output}'...")
+    files = OutputWriter()
+    files.write(output, content)
+    echo(f"Output files: {files.summary}")
 
 
 @cli.command()
-@click.argument("boards", nargs=-1, required=True)
+@board_selection()
 @click.option("--output", "-o", default=".", help="Output directory")
 @click.option("--subdir", "-O", is_flag=True, help="Output into per-board subdirectory")
 def write(
@@ -154,90 +419,464 @@ def write(
     subdir: bool,
 ):
     """Write board README.md"""
+    from .readme.writer import ReadmeWriter
+
     boards = load_boards(boards)
 
     if output:
         os.makedirs(output, exist_ok=True)
 
+    files = OutputWriter()
     for board in boards:
         board: Board
-        readme = ReadmeWriter(core)
-        readme.write(board=board)
+        with core.stage("readme", board=board.id):
+            stream = StringIO()
+            ReadmeWriter(core, stream).write(board=board)
+            stream.write("\n")
 
-        md = join(output, f"{board.id}.md")
-        if subdir:
-            md = join(output, board.id, f"README.md")
-
-        echo(f"Saving to '{md}'...")
-        readme.save(md)
+        md = get_output_path(board, "readme", output, subdir)
+        generator.save_file(files, md, stream.getvalue())
+    echo(f"Output files: {files.summary}")
 
 
 @cli.command()
-@click.argument("boards", nargs=-1, required=True)
+@board_selection()
 @click.option("--output", "-o", default=".", help="Output directory")
 @click.option("--subdir", "-O", is_flag=True, help="Output into per-board subdirectory")
+@click.option(
+    "--shared",
+    "-S",
+    is_flag=True,
+    help="Move content shared by boards of a family to family-level headers",
+)
 def variant(
     boards: list[str],
     output: str,
     subdir: bool,
+    shared: bool,
 ):
     """Write board variant definitions (.h/.cpp)"""
+    from .variant.shared import SharedVariants
+    from .variant.writer import VariantWriter
+
     boards = load_boards(boards)
 
     if output:
         os.makedirs(output, exist_ok=True)
 
+    files = OutputWriter()
+    variants = SharedVariants()
     for board in boards:
         board: Board
-        writer = VariantWriter(core)
-        writer.generate(board=board)
-
-        out_h = join(output, f"{board.id}.h")
-        out_c = join(output, f"{board.id}.c")
-        if subdir:
-            out_h = join(output, board.id, f"variant.h")
-            out_c = join(output, board.id, f"variant.c")
+        with core.stage("variant", board=board.id):
+            writer = VariantWriter(core)
+            writer.generate(board=board)
 
-        echo(f"Saving to '{out_h}' and '{out_c}'...")
+        if shared:
+            variants.add(board, writer)
+            continue
         board_name = f"{board.id}.json"
-        writer.save_h(out_h, board_name)
+        outputs = {"variant_h": writer.format_h(board_name)}
         if writer.pins:
-            writer.save_c(out_c, board_name)
+            outputs["variant_c"] = writer.format_c(board_name)
+        generator.save_outputs(
+            board, outputs, output, subdir, files, names=VARIANT_OUTPUTS
+        )
+
+    if shared:
+        headers, board_outputs = variants.generate(prefix="../" if subdir else "")
+        for name, content in sorted(headers.items()):
+            generator.save_file(files, join(output, name), content)
+        for board in boards:
+            outputs = board_outputs[board.id]
+            generator.save_outputs(
+                board, outputs, output, subdir, files, names=VARIANT_OUTPUTS
+            )
+        for path in variants.get_stale_headers(output, headers):
+            if files.remove(path):
+                echo(f"Removed '{path}'")
+        echo(f"Boards: {len(boards)}, shared headers: {len(headers)}")
+    echo(f"Output files: {files.summary}")
 
 
 @cli.command()
-@click.argument("boards", nargs=-1, required=True)
+@board_selection()
 @click.option("--output", "-o", default=".", help="Output directory")
 @click.option("--subdir", "-O", is_flag=True, help="Output into per-board subdirectory")
-@click.pass_context
+@click.option("--lock", "-l", "lock_path", help="Write a lockfile of inputs/outputs")
+@click.option(
+    "--incremental",
+    "-I",
+    is_flag=True,
+    help=f"Skip boards up to date in the lockfile (default {LOCK_FILE})",
+)
 def all(
-    ctx,
     boards: list[str],
     output: str,
     subdir: bool,
+    lock_path: str,
+    incremental: bool,
 ):
     """Draw and generate complete board specifications"""
-    boards = load_boards(boards)
+    generator.generate(
+        boards,
+        targets=[(ALL_OUTPUTS, output, subdir)],
+        lock_path=lock_path,
+        incremental=incremental,
+    )
 
-    ctx.invoke(draw, boards=boards, output=output, subdir=subdir)
-    ctx.invoke(write, boards=boards, output=output, subdir=subdir)
-    ctx.invoke(variant, boards=boards, output=output, subdir=subdir)
+
+@cli.command()
+@click.argument("boards", nargs=-1)
+@click.option("--output", "-o", default=".", help="Output directory")
+@click.option("--subdir", "-O", is_flag=True, help="Output into per-board subdirectory")
+@click.option("--interval", "-i", default=0.5, help="Polling interval (seconds)")
+@click.pass_context
+def watch(
+    ctx,
+    boards: list[str],
+    output: str,
+    subdir: bool,
+    interval: float,
+):
+    """Rebuild boards whenever their source files change"""
+    params = ctx.parent.params
+    res_files = [core._file_presets, core._file_roles, core._file_flash]
+    res_files += list(params["presets"] + params["roles"] + params["flash"])
+    res_files = set(abspath(file) for file in res_files)
+    dir_types = ["boards", "shapes", "templates"]
+
+    # { board_name: {(type, name), ...} } - JSON files used by each board
+    deps: dict[str, set[tuple[str, str]]] = {}
+    loaded: set[tuple[str, str]] = set()
+
+    def json_hook(type: str, name: str, *_) -> None:
+        loaded.add((type, name.replace("\\", "/")))
+
+    core.json_hook = json_hook
+
+    def get_selected() -> set[str]:
+        names = core.list_json("boards")
+        if not boards or "all" in boards:
+            return names
+        return names & set(boards)
+
+    def build(name: str) -> None:
+        loaded.clear()
+        loaded.add(("boards", name))
+        try:
+            core.remove_from_cache("board_objs", name)
+            board = core.get_board(name)
+            outputs = core.render(board)
+        except Exception as e:
+            echo(f"Building '{name}' failed - {type(e).__name__}: {e}")
+            # keep the previous dependencies, to retry when any of them changes
+            deps[name] = deps.get(name, set()) | loaded
+            return
+        deps[name] = set(loaded)
+        files = OutputWriter()
+        generator.save_outputs(board, outputs, output, subdir, files, names=ALL_OUTPUTS)
+
+    for board_name in sorted(get_selected()):
+        build(board_name)
+
+    dirs = set(dir for type in dir_types for dir in core.get_dirs(type))
+    watcher = FileWatcher(sorted(dirs), sorted(res_files), interval)
+    mode = "inotify" if watcher.is_inotify else "polling"
+    echo(f"Watching for changes ({mode}), press Ctrl+C to stop...")
+    try:
+        while True:
+            changed = watcher.wait()
+            selected = get_selected()
+            if changed & res_files:
+                # presets/roles/flash are used by all boards
+                core.clear_cache()
+                load_custom_json(params["presets"], params["roles"], params["flash"])
+                rebuild = selected
+            else:
+                keys = set()
+                for path in changed:
+                    keys |= get_json_keys(core, path, dir_types)
+                for key in keys:
+                    core.remove_from_cache(*key)
+                rebuild = {name for name, used in deps.items() if used & keys}
+                # newly added boards
+                rebuild |= {name for type, name in keys if type == "boards"}
+            for board_name in set(deps) - selected:
+                deps.pop(board_name)
+            for board_name in sorted(rebuild & selected):
+                build(board_name)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        watcher.close()
+        core.json_hook = None
 
 
 @cli.command()
-@click.option("--no-docs", "-D", is_flag=True, help="Write variant files only")
+@click.option("--socket", "-s", "socket_path", help="Listen on a Unix socket")
+@click.option("--host", "-H", default="127.0.0.1", help="HTTP listen address")
+@click.option("--port", "-p", type=int, help="Listen on a HTTP port")
+@click.option("--interval", "-i", default=0.5, help="Polling interval (seconds)")
 @click.pass_context
-def ltci(ctx, no_docs: bool):
+def serve(ctx, socket_path: str, host: str, port: int, interval: float):
+    """Answer render/list/validate requests (JSON) using a warm cache
+
+    Run in the LibreTiny root, so that families.json is watched as well.
+    """
+    from .server import RenderServer
+
+    if not socket_path and not port:
+        echo("Specify --socket and/or --port")
+        exit(1)
+    params = ctx.parent.params
+
+    server = RenderServer(
+        core,
+        core.res_files,
+        reload=lambda: load_custom_json(
+            params["presets"], params["roles"], params["flash"]
+        ),
+    )
+    if socket_path:
+        server.listen_unix(socket_path)
+        echo(f"Listening on '{socket_path}'")
+    if port:
+        server.listen_http(host, port)
+        echo(f"Listening on http://{host}:{port}/")
+    watcher = server.watch(interval)
+    mode = "inotify" if watcher.is_inotify else "polling"
+    echo(f"Watching for changes ({mode}), press Ctrl+C to stop...")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+
+
+@cli.command()
+@board_selection(default_all=True)
+@click.option("--no-docs", "-D", is_flag=True, help="Write variant files only")
+@click.option("--lock", "-l", "lock_path", help="Write a lockfile of inputs/outputs")
+@click.option(
+    "--incremental",
+    "-I",
+    is_flag=True,
+    help=f"Skip boards up to date in the lockfile (default {LOCK_FILE})",
+)
+@click.option(
+    "--index",
+    "-x",
+    "index_path",
+    help="Also write a table of the boards (.md, .json or .csv)",
+)
+def ltci(
+    boards: list[str],
+    no_docs: bool,
+    lock_path: str,
+    incremental: bool,
+    index_path: str,
+):
     """Generate board files for LibreTiny CI"""
     if not isfile("families.json"):
         print("Run this command in LT root directory")
         exit(1)
-    boards = load_boards(["all"])
 
-    if not no_docs:
-        ctx.invoke(draw, boards=boards, output="boards/", subdir=True)
-        ctx.invoke(write, boards=boards, output="boards/", subdir=True)
-    ctx.invoke(variant, boards=boards, output="boards/variants/", subdir=False)
+    generator.ltci(
+        boards,
+        no_docs=no_docs,
+        lock_path=lock_path,
+        incremental=incremental,
+        index_path=index_path,
+    )
+
+
+@cli.command()
+@board_selection(default_all=True)
+@click.option(
+    "--output",
+    "-o",
+    default="-",
+    help="Output file (.md, .json or .csv), '-' for stdout",
+)
+@click.option(
+    "--format",
+    "-f",
+    "fmt",
+    type=click.Choice(["md", "json", "csv"]),
+    default=None,
+    help="Output format (default: from the file extension, or md)",
+)
+@click.option(
+    "--link",
+    default="",
+    help="Board link format (md), '{id}' is the board code; empty to disable",
+)
+def index(boards: list[str], output: str, fmt: str, link: str):
+    """Write a table of boards (MCU, memory, pin counts)"""
+    from .readme.index import IndexWriter
+
+    if boards[0] == "all":
+        boards = sorted(core.list_json("boards"))
+    writer = IndexWriter(core)
+    for name in boards:
+        writer.add(name)
+    content = writer.format(fmt or IndexWriter.get_format(output), link)
+    if output == "-":
+        echo(content, nl=False)
+        return
+    files = OutputWriter()
+    generator.save_file(files, output, content)
+    echo(f"Output files: {files.summary}")
+
+
+@cli.command()
+@click.argument("boards", nargs=-1)
+@click.option(
+    "--lock",
+    "-l",
+    "lockfile",
+    default=LOCK_FILE,
+    help=f"Lockfile to check (default {LOCK_FILE})",
+)
+def check(boards: list[str], lockfile: str):
+    """Check that a lockfile's outputs are up to date"""
+    if not isfile(lockfile):
+        echo(f"Lockfile '{lockfile}' not found")
+        exit(1)
+    lock = BuildLock(core, lockfile)
+    if lock.lock_version != lock.version:
+        echo(f"Lockfile generated by boardgen v{lock.lock_version}")
+        exit(1)
+    if boards and boards[0] == "all":
+        boards = sorted(core.list_json("boards"))
+    boards = boards or sorted(lock.boards)
+
+    outdated = 0
+    for name in boards:
+        stale = lock.get_stale_files(name)
+        if stale is None:
+            echo(f"Board '{name}' is not in the lockfile")
+        elif stale:
+            echo(f"Board '{name}' is out of date: {', '.join(stale)}")
+        else:
+            continue
+        outdated += 1
+    if outdated:
+        echo(f"{outdated} of {len(boards)} board(s) out of date")
+        exit(1)
+    echo(f"All {len(boards)} board(s) up to date")
+
+
+@cli.command()
+@board_selection(default_all=True)
+@click.option(
+    "--against",
+    "-a",
+    required=True,
+    help="Output directory or lockfile to compare with",
+)
+@click.option("--subdir", "-O", is_flag=True, help="Directory has per-board subdirs")
+@click.option(
+    "--type",
+    "-t",
+    "names",
+    type=click.Choice(ALL_OUTPUTS),
+    multiple=True,
+    help="Outputs to compare (default: all)",
+)
+@click.option("--verbose", "-v", is_flag=True, help="Print all changed items")
+def diff(
+    boards: list[str],
+    against: str,
+    subdir: bool,
+    names: tuple[str],
+    verbose: bool,
+):
+    """Compare outputs built in memory with a directory or lockfile"""
+    from .diff import MAX_DETAILS, diff_output
+
+    names = list(names) or ALL_OUTPUTS
+    lock = None
+    if isfile(against):
+        lock = BuildLock(core, against)
+    elif not isdir(against):
+        echo(f"'{against}' is not a directory or lockfile")
+        exit(1)
+    if boards[0] == "all":
+        boards = sorted(core.list_json("boards"))
+
+    def read(path: str) -> str | bytes | None:
+        if not isfile(path):
+            return None
+        if path.endswith(".png"):
+            with open(path, "rb") as f:
+                return f.read()
+        # universal newlines - text outputs are written with os.linesep
+        with open(path, "r", encoding="utf-8") as f:
+            return f.read()
+
+    changed = 0
+    for name in boards:
+        board = core.get_board(name)
+        outputs = core.render(board, outputs=names)
+
+        # { output_name: (digest, content or None) }
+        previous = {}
+        if lock:
+            if name not in lock.boards:
+                echo(f"Board '{name}' is not in the lockfile")
+                changed += 1
+                continue
+            for path, digest in lock.boards[name].get("outputs", {}).items():
+                output_name = get_output_name(path)
+                if output_name not in names:
+                    continue
+                content = read(lock._abs(path))
+                if content is not None and hash_content(content) != digest:
+                    # the file itself was changed since
+                    content = None
+                previous[output_name] = (digest, content)
+        else:
+            for output_name in names:
+                content = read(get_output_path(board, output_name, against, subdir))
+                if content is not None:
+                    previous[output_name] = (hash_content(content), content)
+
+        changes = {}
+        for output_name in names:
+            if output_name not in outputs:
+                if output_name in previous:
+                    changes[output_name] = ["- output removed"]
+                continue
+            if output_name not in previous:
+                changes[output_name] = ["+ output added"]
+                continue
+            digest, content = previous[output_name]
+            if hash_content(outputs[output_name]) == digest:
+                continue
+            if content is None:
+                changes[output_name] = ["~ content changed"]
+            else:
+                changes[output_name] = diff_output(
+                    output_name, content, outputs[output_name]
+                )
+
+        if not changes:
+            continue
+        changed += 1
+        echo(f"Board '{name}': {', '.join(changes)} changed")
+        for output_name, lines in changes.items():
+            echo(f"  {output_name}: {len(lines)} item(s)")
+            shown = lines if verbose else lines[0:MAX_DETAILS]
+            for line in shown:
+                echo(f"    {line}")
+            if len(shown) < len(lines):
+                echo(f"    ... and {len(lines) - len(shown)} more")
+
+    if changed:
+        echo(f"{changed} of {len(boards)} board(s) changed")
+        exit(1)
+    echo(f"No changes in {len(boards)} board(s)")
 
 
 @cli.group(name="list")
@@ -247,25 +886,31 @@ def list_cmd():
 
 @list_cmd.command(name="boards")
 @click.option("--full", "-f", is_flag=True, help="Print more details")
-def list_boards(full: bool):
+@click.option("--json", "as_json", is_flag=True, help="Print as JSON")
+def list_boards(full: bool, as_json: bool):
     """List available boards"""
-    boards = core.list_json("boards")
+    names = sorted(core.list_json("boards"))
+    boards = {name: core.get_board_meta(name) for name in names}
+    if as_json:
+        echo(json.dumps(list(boards.values()), indent="\t"))
+        return
     echo("Available boards:")
-    for board_name in boards:
-        board = core.get_board(board_name)
-        echo(f" - '{board_name}': {board.name} / {board.vendor}")
+    for board_name, board in boards.items():
+        echo(f" - '{board_name}': {board['name']} / {board['vendor']}")
         if full:
-            echo(f"    - CPU: {board.build.mcu.upper()} @ {board.cpu_freq}")
-            echo(f"    - Flash: {board.size_flash}")
-            echo(f"    - RAM: {board.size_ram}")
-            echo(f"    - Pin count: {len(board.pcb.pinout)}")
-            echo(f"    - Connectivity: {board.connectivity}")
+            echo(f"    - CPU: {(board['mcu'] or '').upper()} @ {board['cpu_freq']}")
+            echo(f"    - Flash: {board['flash']}")
+            echo(f"    - RAM: {board['ram']}")
+            echo(f"    - Pin count: {board['pin_count']}")
+            echo(f"    - Connectivity: {board['connectivity']}")
 
 
 @list_cmd.command(name="templates")
 @click.option("--full", "-f", is_flag=True, help="Print more details")
 def list_templates(full: bool):
     """List available templates"""
+    from .models import Template
+
     templates = core.list_json("templates")
     echo("Available templates:")
     for template_name in templates:
@@ -1,6 +1,7 @@
 # Copyright (c) Kuba Szczodrzyński 2022-05-12.
 
 from abc import ABC
+from contextlib import AbstractContextManager, nullcontext
 from glob import glob
 from os.path import isfile, join, relpath
 from typing import Callable, Optional
@@ -14,8 +15,12 @@ class CoreCache(ABC):
         "board_objs": {},
         "shapes": {},
         "templates": {},
+        # { input_hash: [fragments] } - README sections
+        "readme": {},
     }
     json_hook: Optional[Callable[[str, str, dict, Optional[str]], None]] = None
+    # boardgen.profiler.Profiler, if enabled
+    profiler = None
 
     def clear_cache(self) -> None:
         for obj in self._cache.values():
@@ -23,10 +28,17 @@ class CoreCache(ABC):
         self._presets = None
         self._roles = None
         self._flash = None
+        self._families = None
 
     def remove_from_cache(self, type: str, name: str) -> None:
         self._cache[type].pop(name, None)
 
+    def stage(self, name: str, board: str = None) -> AbstractContextManager:
+        """Measure a build stage, if a profiler is set."""
+        if self.profiler:
+            return self.profiler.stage(name, board)
+        return nullcontext()
+
     def get_dirs(self, type: str) -> list[str]:
         attr_name = f"_dirs_{type}"
         if not hasattr(self, attr_name):
@@ -53,7 +65,8 @@ class CoreCache(ABC):
         for dir in dirs:
             file = join(dir, f"{name}.json")
             if isfile(file):
-                data = load_json(file)
+                with self.stage("json_load"):
+                    data = load_json(file)
                 self._cache[type][name] = data
                 if self.json_hook:
                     self.json_hook(type, name, data, file)
@@ -69,21 +82,30 @@ class CoreCache(ABC):
 
     def load_board(self, name: str, allow_cache: bool = True) -> dict:
         if allow_cache and name in self._cache["board_objs"]:
+            if self.json_hook:
+                # report the files the merged manifest was made of
+                manifest = self.load_json("boards", name)
+                for base in self.get_board_bases(manifest):
+                    self.load_board_base(base)
             return self._cache["board_objs"][name]
         manifest = self.load_json("boards", name)
         if "_base" in manifest:
-            bases = manifest["_base"]
-            if not isinstance(bases, list):
-                bases = [bases]
-
-            result = {}
-            for base in bases:
-                base_manifest = self.load_board_base(base)
-                merge_dicts(result, base_manifest)
-            merge_dicts(result, manifest)
-            manifest = result
+            bases = self.get_board_bases(manifest)
+
+            with self.stage("base_merge"):
+                result = {}
+                for base in bases:
+                    base_manifest = self.load_board_base(base)
+                    merge_dicts(result, base_manifest)
+                merge_dicts(result, manifest)
+                manifest = result
         self._cache["board_objs"][name] = manifest
         return manifest
 
+    @staticmethod
+    def get_board_bases(manifest: dict) -> list[str]:
+        bases = manifest.get("_base", [])
+        return bases if isinstance(bases, list) else [bases]
+
     def load_template(self, name: str) -> dict:
         return self.load_json("templates", name)
@@ -3,26 +3,47 @@
 import json
 import re
 from copy import deepcopy
-from importlib.metadata import version
+from fnmatch import fnmatch
+from functools import cache
+from io import StringIO
 from os.path import dirname, isfile, join
+from typing import TYPE_CHECKING
 
-from ..mixins import HasId, ParentType
-from ..models import Board, FlashRegion, Pcb, RoleType, ShapeType, Side, Template
-from ..models.enums import RoleValue
-from ..shapes.base import Shape
-from ..shapes.circle import Circle
-from ..shapes.group import ShapeGroup
-from ..shapes.label import Label
-from ..shapes.rect import Rect
-from ..shapes.text import Text
-from ..utils import var
+from ..utils import sizeof, var
 from ..vector import V
 from .cache import CoreCache
 from .getters import CoreGetters
 
+# models and shapes are imported when first needed - they pull in
+# pydantic and svgwrite, which is slow for the CLI's startup time
+if TYPE_CHECKING:
+    from ..mixins import HasId, ParentType
+    from ..models import Board, Pcb, ShapeType, Side
+    from ..models.enums import RoleValue
+    from ..pin_index import PinIndex
+    from ..shapes.base import Shape
+    from ..shapes.label import Label
+
+
+@cache
+def get_version() -> str | None:
+    pyproject = join(dirname(__file__), "..", "..", "pyproject.toml")
+    if isfile(pyproject):
+        with open(pyproject, "r", encoding="utf-8") as f:
+            text = f.read()
+            ver = re.search(r"version\s?=\s?\"(.+?)\"", text)
+            if ver:
+                return ver.group(1)
+    try:
+        from importlib.metadata import version
+
+        return version("boardgen")
+    except Exception:
+        return None
+
 
 class Core(CoreCache, CoreGetters):
-    shape_ctors: dict[ShapeType, type]
+    _shape_ctors: dict["ShapeType", type] = None
     is_libretiny: bool = False
 
     dir_base: str
@@ -49,27 +70,30 @@ class Core(CoreCache, CoreGetters):
         self._file_presets = join(self.dir_base, "presets.json")
         self._file_roles = join(self.dir_base, "roles.json")
         self._file_flash = join(self.dir_base, "flash.json")
-        self.shape_ctors = {
-            ShapeType.RECT: Rect,
-            ShapeType.CIRCLE: Circle,
-            ShapeType.SUBSHAPE: ShapeGroup,
-            ShapeType.TEXT: Text,
-        }
+        # custom presets/roles/flash files, merged into the above
+        self._files_custom = []
         self.is_libretiny = isfile("families.json")
 
+    @property
+    def shape_ctors(self) -> dict["ShapeType", type]:
+        if self._shape_ctors is None:
+            from ..models import ShapeType
+            from ..shapes.circle import Circle
+            from ..shapes.group import ShapeGroup
+            from ..shapes.rect import Rect
+            from ..shapes.text import Text
+
+            self._shape_ctors = {
+                ShapeType.RECT: Rect,
+                ShapeType.CIRCLE: Circle,
+                ShapeType.SUBSHAPE: ShapeGroup,
+                ShapeType.TEXT: Text,
+            }
+        return self._shape_ctors
+
     @property
     def version(self) -> str | None:
-        pyproject = join(dirname(__file__), "..", "..", "pyproject.toml")
-        if isfile(pyproject):
-            with open(pyproject, "r", encoding="utf-8") as f:
-                text = f.read()
-                ver = re.search(r"version\s?=\s?\"(.+?)\"", text)
-                if ver:
-                    return ver.group(1)
-        try:
-            return version("boardgen")
-        except Exception:
-            return None
+        return get_version()
 
     def add_custom_dirs(
         self,
@@ -96,7 +120,17 @@ class Core(CoreCache, CoreGetters):
         presets: dict = None,
         roles: dict = None,
         flash: dict = None,
+        files: list[str] = None,
     ):
+        """Merge custom presets, roles and flash regions.
+
+        Args:
+            files (list[str], optional): JSON files the data was read from,
+                recorded as inputs of each board (see res_files).
+        """
+        for file in files or []:
+            if file not in self._files_custom:
+                self._files_custom.append(file)
         if presets:
             self.presets.update(presets)
         if roles:
@@ -104,7 +138,12 @@ class Core(CoreCache, CoreGetters):
         if flash:
             self.flash.update(flash)
 
-    def build_shapes(self, name: str, parent: ParentType, pos: V = None) -> list[Shape]:
+    def build_shapes(
+        self,
+        name: str,
+        parent: "ParentType",
+        pos: V = None,
+    ) -> list["Shape"]:
         """Load the specified shape JSON into a list of Shape objects.
 
         Args:
@@ -115,7 +154,7 @@ class Core(CoreCache, CoreGetters):
         shape = self.load_shape(name)
         return [self.build_shape(parent, data, pos) for data in shape]
 
-    def build_shape(self, parent: ParentType, data: dict, pos: V = None) -> Shape:
+    def build_shape(self, parent: "ParentType", data: dict, pos: V = None) -> "Shape":
         """Deserialize a single shape from JSON.
 
         Args:
@@ -123,9 +162,12 @@ class Core(CoreCache, CoreGetters):
             data (dict): Input JSON data.
             pos (V, optional): Move the shape by the vector. Defaults to None.
         """
-        shape = Shape.deserialize(self, parent, data)
-        if pos:
-            shape.move(pos)
+        from ..shapes.base import Shape
+
+        with self.stage("shapes"):
+            shape = Shape.deserialize(self, parent, data)
+            if pos:
+                shape.move(pos)
         return shape
 
     def build_presets(self, vars: dict) -> dict[str, dict]:
@@ -136,17 +178,106 @@ class Core(CoreCache, CoreGetters):
         """
         if not vars:
             return self.presets
-        # ugly way to replace all vars
-        presets = json.dumps(self.presets)
-        presets = var(presets, vars)
-        return json.loads(presets)
+        with self.stage("vars"):
+            # ugly way to replace all vars
+            presets = json.dumps(self.presets)
+            presets = var(presets, vars)
+            return json.loads(presets)
+
+    def get_board_meta(self, name: str) -> dict:
+        """Read basic board information from the merged manifest only,
+        without validating it or building any shapes.
+
+        Args:
+            name (str): Board name.
+
+        Returns:
+            dict: id, name, vendor, family, mcu, cpu_freq, flash, ram,
+            pin_count, gpio_count and connectivity of the board.
+        """
+        with self.stage("board_meta", board=name):
+            manifest = self.load_board(name)
+            build = manifest.get("build", {})
+            upload = manifest.get("upload", {})
+            pcb = manifest.get("pcb", None) or {}
+            pinout = pcb.get("pinout", None) or {}
+            f_cpu = "".join(c for c in str(build.get("f_cpu", "")) if c.isnumeric())
+            return dict(
+                id=build.get("variant", name),
+                name=manifest.get("name", None),
+                vendor=manifest.get("vendor", None),
+                family=build.get("family", None),
+                mcu=build.get("mcu", None),
+                cpu_freq=sizeof(int(f_cpu), suffix="Hz", base=1000) if f_cpu else None,
+                flash=sizeof(upload["flash_size"]) if "flash_size" in upload else None,
+                ram=(
+                    sizeof(upload["maximum_ram_size"])
+                    if "maximum_ram_size" in upload
+                    else None
+                ),
+                pin_count=len(pinout),
+                gpio_count=sum("GPIO" in pin for pin in pinout.values()),
+                connectivity=manifest.get("connectivity", []),
+            )
+
+    def find_boards(
+        self,
+        names: list[str] = None,
+        match: list[str] = None,
+        family: list[str] = None,
+        vendor: list[str] = None,
+        mcu: list[str] = None,
+    ) -> list[str]:
+        """Select boards by their manifest metadata, without building them.
+
+        Each filter is a list of glob patterns (case-insensitive); a board
+        must match any pattern of every specified filter.
+
+        Args:
+            names (list[str], optional): Boards to choose from. Defaults to all.
+            match (list[str], optional): Board names.
+            family (list[str], optional): Family names (any of the family's
+                names, or of its parent families).
+            vendor (list[str], optional): Board vendors.
+            mcu (list[str], optional): MCU names.
+
+        Returns:
+            list[str]: Sorted names of matching boards.
+        """
+
+        def matches(value: str | set[str] | None, patterns: list[str]) -> bool:
+            if not patterns:
+                return True
+            values = value if isinstance(value, set) else {value or ""}
+            return any(fnmatch(v.lower(), p.lower()) for v in values for p in patterns)
+
+        result = []
+        for name in sorted(names or self.list_json("boards")):
+            if not matches(name, match):
+                continue
+            meta = self.get_board_meta(name)
+            families = self.family_names(meta["family"] or "") if family else None
+            if (
+                matches(families, family)
+                and matches(meta["vendor"], vendor)
+                and matches(meta["mcu"], mcu)
+            ):
+                result.append(name)
+        return result
 
-    def get_board(self, name: str) -> Board:
+    def get_board(self, name: str) -> "Board":
         """Load and build the specified board.
 
         Args:
             name (str): Board name.
         """
+        with self.stage("board", board=name):
+            return self._build_board(name)
+
+    def _build_board(self, name: str) -> "Board":
+        from ..models import Board, FlashRegion, Side, Template
+        from ..shapes.group import ShapeGroup
+
         manifest = self.load_board(name)
         manifest = deepcopy(manifest)
         pcb = manifest.get("pcb", None)
@@ -228,14 +359,15 @@ class Core(CoreCache, CoreGetters):
         sources: list[HasId] = []
         all_vars = dict(pcb.vars)
         pcb.vars = all_vars
-        for template_name in pcb.templates:
-            template = Template(**deepcopy(self.load_template(template_name)))
-            template.vars |= pcb.vars
-            all_vars |= template.vars
-            template.vars = all_vars
-            pcb.pads |= template.pads
-            pcb.test_pads |= template.test_pads
-            sources.append(template)
+        with self.stage("templates"):
+            for template_name in pcb.templates:
+                template = Template(**deepcopy(self.load_template(template_name)))
+                template.vars |= pcb.vars
+                all_vars |= template.vars
+                template.vars = all_vars
+                pcb.pads |= template.pads
+                pcb.test_pads |= template.test_pads
+                sources.append(template)
         sources.append(pcb)
 
         for side in Side:
@@ -252,10 +384,26 @@ class Core(CoreCache, CoreGetters):
 
         return board
 
-    def build_labels(self, pcb: Pcb, side: Side) -> tuple[list[Label], V, V]:
+    def get_pin_index(self, pcb: "Pcb") -> "PinIndex":
+        """Return the PCB's pinout index, building it on first use."""
+        from ..pin_index import PinIndex
+
+        if pcb._pin_index is None:
+            pcb._pin_index = PinIndex(self, pcb)
+        return pcb._pin_index
+
+    def build_labels(self, pcb: "Pcb", side: "Side") -> tuple[list["Label"], V, V]:
+        with self.stage("labels"):
+            return self._build_labels(pcb, side)
+
+    def _build_labels(self, pcb: "Pcb", side: "Side") -> tuple[list["Label"], V, V]:
+        from ..models import RoleType
+        from ..shapes.label import Label
+
         pads = pcb.pads
         pads |= pcb.test_pads
-        pins = pcb.pinout
+        index = self.get_pin_index(pcb)
+        pins = index.pins
         hidden = pcb.pinout_hidden.split(",") + pcb.drawing_hidden.split(",")
 
         x1, y1, x2, y2 = (None, None, None, None)
@@ -273,7 +421,7 @@ class Core(CoreCache, CoreGetters):
                 color="#000",
                 roles=roles,
             )
-            label.build(self, pin, pad, hidden)
+            label.build(self, pin, pad, hidden, index=index)
             if x1 is None:
                 x1 = label.pos1.x
                 y1 = label.pos1.y
@@ -287,3 +435,75 @@ class Core(CoreCache, CoreGetters):
             labels.append(label)
 
         return (labels, V(x1, y1), V(x2, y2))
+
+    def render(
+        self,
+        board: "Board | str",
+        outputs: list[str] = None,
+        px_size: V = V(1024, 500),
+        scale: float = None,
+        with_canvas: bool = True,
+        with_labels: bool = True,
+    ) -> dict[str, str | bytes]:
+        """Render the board's output files in memory, without any file I/O.
+
+        Args:
+            board (Board | str): Board object or name.
+            outputs (list[str], optional): Outputs to produce - any of "svg",
+                "png", "readme", "variant_h" and "variant_c". Defaults to all
+                except "png".
+            px_size (V, optional): Image size (px). Defaults to 1024x500.
+            scale (float, optional): Diagram scale. Defaults to the PCB's scale.
+            with_canvas (bool, optional): Draw a white background with border.
+            with_labels (bool, optional): Draw pin labels.
+
+        Returns:
+            dict[str, str | bytes]: Output name to content ("png" is bytes).
+            Outputs not applicable to the board are omitted.
+        """
+        from ..draw_util import draw_shapes, get_pcb_images, svg_to_string
+        from ..raster import get_rasterizer
+        from ..readme import ReadmeWriter
+        from ..variant import VariantWriter
+
+        if isinstance(board, str):
+            board = self.get_board(board)
+        if outputs is None:
+            outputs = ["svg", "readme", "variant_h", "variant_c"]
+        result = {}
+
+        pcb = board.pcb
+        if ("svg" in outputs or "png" in outputs) and pcb and pcb.templates:
+            if scale is None:
+                scale = 12 if pcb.scale is None else pcb.scale
+            with self.stage("draw", board=board.id):
+                images = get_pcb_images(self, pcb, with_labels)
+                dwg = draw_shapes(px_size, scale, images, with_canvas)
+            if "svg" in outputs:
+                with self.stage("serialize"):
+                    result["svg"] = svg_to_string(dwg)
+            if "png" in outputs:
+                rasterize = get_rasterizer()
+                if not rasterize:
+                    raise RuntimeError("No SVG rasterizer available for PNG output")
+                with self.stage("raster"):
+                    result["png"] = rasterize(dwg.tostring(), px_size)
+
+        if "readme" in outputs:
+            with self.stage("readme", board=board.id):
+                stream = StringIO()
+                ReadmeWriter(self, stream).write(board=board)
+                stream.write("\n")
+                result["readme"] = stream.getvalue()
+
+        if "variant_h" in outputs or "variant_c" in outputs:
+            with self.stage("variant", board=board.id):
+                writer = VariantWriter(self)
+                writer.generate(board=board)
+                board_name = f"{board.id}.json"
+                if "variant_h" in outputs:
+                    result["variant_h"] = writer.format_h(board_name)
+                if "variant_c" in outputs and writer.pins:
+                    result["variant_c"] = writer.format_c(board_name)
+
+        return result
@@ -1,19 +1,24 @@
 # Copyright (c) Kuba Szczodrzyński 2022-05-12.
 
 from abc import ABC
-from typing import Callable, Optional
+from os.path import isfile
+from typing import TYPE_CHECKING, Callable, Optional
 
-from ..models import Role, RoleType
 from ..utils import load_json
 
+if TYPE_CHECKING:
+    from ..models import Role, RoleType
+
 
 class CoreGetters(ABC):
     _file_presets: str
     _file_roles: str
     _file_flash: str
+    _files_custom: list[str]
     _presets: dict[str, dict] = None
-    _roles: dict[RoleType, Role] = None
+    _roles: dict["RoleType", "Role"] = None
     _flash: dict[str, str] = None
+    _families: list[dict] = None
     json_hook: Optional[Callable[[str, str, dict, Optional[str]], None]]
 
     @property
@@ -25,7 +30,9 @@ class CoreGetters(ABC):
         return self._presets
 
     @property
-    def roles(self) -> dict[RoleType, Role]:
+    def roles(self) -> dict["RoleType", "Role"]:
+        from ..models import Role, RoleType
+
         if not self._roles:
             roles = load_json(self._file_roles)
             self._roles = {
@@ -34,7 +41,7 @@ class CoreGetters(ABC):
             }
         return self._roles
 
-    def role(self, role_type: RoleType) -> Role | None:
+    def role(self, role_type: "RoleType") -> "Role | None":
         return self.roles.get(role_type, None)
 
     @property
@@ -42,3 +49,41 @@ class CoreGetters(ABC):
         if not self._flash:
             self._flash = load_json(self._file_flash)
         return self._flash
+
+    @property
+    def res_files(self) -> list[str]:
+        """JSON files used by every board - built-in and custom presets,
+        roles and flash regions, and LibreTiny families (if present).
+        """
+        files = [self._file_presets, self._file_roles, self._file_flash]
+        if isfile("families.json"):
+            files.append("families.json")
+        return files + self._files_custom
+
+    @property
+    def families(self) -> list[dict]:
+        # LibreTiny family definitions, if running in LT root directory
+        if self._families is None:
+            families = load_json("families.json") if isfile("families.json") else []
+            self._families = families if isinstance(families, list) else []
+        return self._families
+
+    def family_names(self, family: str) -> set[str]:
+        """Return all names of a family (short name, name, code) and of its
+        parent families. Names are lowercase.
+        """
+        keys = ["short_name", "name", "code"]
+        by_name = {}
+        for item in self.families:
+            for key in keys:
+                if item.get(key, None):
+                    by_name[str(item[key]).lower()] = item
+        names = {family.lower()}
+        item = by_name.get(family.lower(), None)
+        seen = []
+        while item and item not in seen:
+            seen.append(item)
+            names |= {str(item[key]).lower() for key in keys if item.get(key, None)}
+            parent = item.get("parent", None)
+            item = by_name.get(parent.lower(), None) if parent else None
+        return names
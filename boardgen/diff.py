@@ -0,0 +1,156 @@
+#  Copyright (c) Kuba Szczodrzyński 2026-10-19.
+
+import re
+from xml.etree import ElementTree
+
+# number of changed items to print per output
+MAX_DETAILS = 10
+
+RE_DEFINE = re.compile(r"^#define (\w+)\s+(.*)$")
+RE_STATIC = re.compile(r"^static const \w+ \w+ (\w+) = (.*);$")
+RE_GPIO_MAP = re.compile(r"^\[(\d+)\]\s*= (.*)$")
+RE_SVG_ID = re.compile(r"^id\d+$")
+
+
+def get_svg_signature(element: ElementTree.Element) -> str:
+    tag = element.tag.rpartition("}")[2]
+    attrs = " ".join(f'{k}="{v}"' for k, v in sorted(element.attrib.items()))
+    text = (element.text or "").strip()
+    children = "".join(get_svg_signature(child) for child in element)
+    return f"<{tag} {attrs}>{text}{children}</{tag}>"
+
+
+def parse_svg(content: str) -> dict[str, str]:
+    """Flatten an SVG into { shape_key: signature }.
+
+    Shapes with an ID are keyed by it, texts by their content; other
+    shapes (i.e. label blocks) are keyed by their signature, so they're
+    reported as added/removed.
+    """
+    items = {}
+    counts = {}
+    root = ElementTree.fromstring(content.encode())
+    for element in root:
+        tag = element.tag.rpartition("}")[2]
+        signature = get_svg_signature(element)
+        key = element.get("id", None)
+        value = signature
+        if key and RE_SVG_ID.match(key):
+            # auto-generated IDs (gradients) change with shape order
+            key = None
+        if not key and tag == "text":
+            key = f"<text> {(element.text or '').strip()}"
+        elif not key:
+            key = signature
+            value = ""
+        counts[key] = counts.get(key, 0) + 1
+        if counts[key] > 1:
+            key = f"{key} #{counts[key]}"
+        items[key] = value
+    return items
+
+
+def parse_readme(content: str) -> dict[str, str]:
+    """Flatten a README into { "heading: row/line": value }.
+
+    Table rows (i.e. pin functions, flash regions) are keyed by
+    their first column, other lines by their content.
+    """
+    items = {}
+    heading = ""
+    for line in content.splitlines():
+        line = line.strip()
+        if not line or set(line) <= set("-|"):
+            continue
+        if line.startswith("#"):
+            heading = line.lstrip("#").strip()
+            items[f"{heading}:"] = ""
+            continue
+        if " | " in line:
+            (key, _, value) = line.partition(" | ")
+            items[f"{heading}: {key.strip()}"] = " | ".join(
+                col.strip() for col in value.split(" | ")
+            )
+            continue
+        items[f"{heading}: {line}"] = ""
+    return items
+
+
+def parse_variant(content: str) -> dict[str, str]:
+    """Flatten a variant .h/.c into { item: value }.
+
+    Macros, static pin names and GPIO map entries are keyed by their names,
+    PinInfo entries by their index, other lines by their content.
+    """
+    items = {}
+    pin_info = 0
+    for line in content.splitlines():
+        line = line.strip()
+        if not line:
+            continue
+        if match := RE_DEFINE.match(line):
+            items[match.group(1)] = " ".join(match.group(2).split())
+        elif match := RE_STATIC.match(line):
+            items[match.group(1)] = match.group(2)
+        elif match := RE_GPIO_MAP.match(line):
+            items[f"[{match.group(1)}]"] = match.group(2)
+        elif line.startswith("// ") and ": " in line:
+            # PinInfo comment, i.e. "// D0: P6, PWM0"
+            (name, _, comment) = line[3:].partition(": ")
+            items[f"PinInfo {name}"] = comment
+        elif line.startswith("{") and line.endswith("},"):
+            items[f"PinInfo #{pin_info}"] = " ".join(line.split())
+            pin_info += 1
+        else:
+            items[line] = ""
+    return items
+
+
+PARSERS = {
+    "svg": parse_svg,
+    "readme": parse_readme,
+    "variant_h": parse_variant,
+    "variant_c": parse_variant,
+}
+
+
+def diff_items(old: dict[str, str], new: dict[str, str]) -> list[str]:
+    """Compare two flattened outputs.
+
+    Returns:
+        list[str]: Added ("+"), removed ("-") and changed ("~") items.
+    """
+    lines = []
+    for key, value in new.items():
+        if key not in old:
+            lines.append(f"+ {key} {value}".rstrip())
+        elif old[key] != value:
+            lines.append(f"~ {key}: {old[key]} -> {value}")
+    for key, value in old.items():
+        if key not in new:
+            lines.append(f"- {key} {value}".rstrip())
+    return lines
+
+
+def diff_output(name: str, old: str | bytes, new: str | bytes) -> list[str]:
+    """Compare two versions of a rendered output.
+
+    Args:
+        name (str): Output name ("svg", "readme", "variant_h", ...).
+        old (str | bytes): Previous content.
+        new (str | bytes): Current content.
+
+    Returns:
+        list[str]: Changed items; empty if the outputs are equal.
+    """
+    if old == new:
+        return []
+    parser = PARSERS.get(name, None)
+    if not parser or isinstance(old, bytes) or isinstance(new, bytes):
+        return ["~ content changed"]
+    try:
+        lines = diff_items(parser(old), parser(new))
+    except ElementTree.ParseError:
+        return ["~ content changed"]
+    # formatting-only changes
+    return lines or ["~ formatting changed"]
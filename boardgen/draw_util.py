@@ -1,13 +1,24 @@
 #  Copyright (c) Kuba Szczodrzyński 2023-6-3.
 
-from svgwrite import Drawing, shapes
+from io import StringIO
+from math import ceil
+from threading import RLock
+from typing import Generator
+
+from svgwrite import Drawing, shapes, text
+from svgwrite.container import Group, Hyperlink
 from svgwrite.utils import AutoID
 
 from .core import Core
 from .models import Pcb, Side
-from .shapes import Shape, ShapeGroup
+from .shapes import Shape, ShapeGroup, SvgLayers, Text
+from .shapes.label import Block, Label
 from .vector import V
 
+# svgwrite's AutoID (gradient IDs) is global - drawings made in parallel
+# (i.e. GUI preview and in-process ltci) would share and reset the counter
+DRAW_LOCK = RLock()
+
 
 def get_pcb_images(core: Core, pcb: Pcb, with_labels: bool) -> list[Shape]:
     shapes = []
@@ -22,16 +33,30 @@ def get_pcb_images(core: Core, pcb: Pcb, with_labels: bool) -> list[Shape]:
     return shapes
 
 
-def draw_shapes(
+def svg_to_string(dwg: Drawing, pretty: bool = True) -> str:
+    """Serialize the Drawing exactly like Drawing.write() does."""
+    svg = StringIO()
+    if pretty:
+        dwg.write(svg, pretty=True, indent=4)
+    else:
+        dwg.write(svg)
+    return svg.getvalue()
+
+
+def get_pcb_pads(pcb: Pcb) -> set[str]:
+    return set(pcb.pads.values()) | set(pcb.test_pads.values())
+
+
+def layout_shapes(
     px_size: V,
     scale: float | None,
     images: list[Shape],
-    with_canvas: bool,
-    rescale_viewbox: bool = True,
-) -> Drawing:
-    AutoID._set_value(1)
-    dwg = Drawing(size=px_size.tuple)
+) -> tuple[float, V, list[V]]:
+    """Stack the images horizontally on a canvas.
 
+    Returns the scale (calculated if not specified), the viewBox size
+    and an offset (in mm) for each image.
+    """
     # stack horizontally
     shape_size = [shape.size for shape in images]
     total_size = sum(s.x for s in shape_size)
@@ -52,27 +77,222 @@ def draw_shapes(
         print(" - calculated scale: %.2f" % scale)
         vb_size = px_size / scale
 
-    if rescale_viewbox:
-        dwg.viewbox(width=px_size.x, height=px_size.y)
-        unit = scale
-    else:
-        dwg.viewbox(width=vb_size.x, height=vb_size.y)
-        unit = 1.0
-
-    if with_canvas:
-        bg = shapes.Rect(insert=(0, 0), size=(vb_size * unit).tuple)
-        bg.fill(color="white")
-        bg.stroke(color="black", width=0.1 * unit)
-        dwg.add(bg)
-
+    positions = []
     for i, shape in enumerate(images):
         shape_pos = ((part_size[i] / scale) - shape_size[i]) / 2
         shape_pos += part_pos[i] / scale
         shape_pos -= shape.pos1
+        positions.append(shape_pos)
+    return scale, vb_size, positions
+
+
+def draw_shapes(
+    px_size: V,
+    scale: float | None,
+    images: list[Shape],
+    with_canvas: bool,
+    rescale_viewbox: bool = True,
+    layered: bool = False,
+    pads: set[str] = None,
+) -> Drawing:
+    with DRAW_LOCK:
+        AutoID._set_value(1)
+        dwg = Drawing(size=px_size.tuple)
+
+        scale, vb_size, positions = layout_shapes(px_size, scale, images)
+
+        if rescale_viewbox:
+            dwg.viewbox(width=px_size.x, height=px_size.y)
+            unit = scale
+        else:
+            dwg.viewbox(width=vb_size.x, height=vb_size.y)
+            unit = 1.0
+
+        if with_canvas:
+            bg = shapes.Rect(insert=(0, 0), size=(vb_size * unit).tuple)
+            bg.fill(color="white")
+            bg.stroke(color="black", width=0.1 * unit)
+            dwg.add(bg)
+
+        layers = SvgLayers(dwg, pads) if layered else None
+
+        for shape, shape_pos in zip(images, positions):
+            if with_canvas:
+                shape_pos.x -= 0.05
+            shape.move(shape_pos)
+            if layers:
+                shape.draw_layered(layers, unit=unit)
+            else:
+                shape.draw(dwg, unit=unit)
+            shape.move(-shape_pos)
+
+        return dwg
+
+
+def iter_leaf_shapes(shape: Shape, skip: set[str]) -> Generator[Shape, None, None]:
+    if shape.fullid in skip:
+        return
+    if isinstance(shape, ShapeGroup):
+        for child in shape.shapes:
+            yield from iter_leaf_shapes(child, skip)
+    elif isinstance(shape, Label):
+        for child in shape.labels:
+            yield from iter_leaf_shapes(child, skip)
+    else:
+        yield shape
+
+
+def draw_tiles(
+    px_size: V,
+    scale: float | None,
+    images: list[Shape],
+    with_canvas: bool,
+    levels: int,
+    tile_size: int = 256,
+    min_text_px: float = 4.0,
+    test_pads: set[str] = None,
+) -> Generator[tuple[int, int, int, Drawing], None, None]:
+    """Draw the images as square tiles at several zoom levels.
+
+    Level 0 is the most zoomed-out; the last level matches the scale
+    of draw_shapes(). Below the last level, test pads and negation
+    lines are culled. Text smaller than min_text_px is culled on every
+    level (label blocks keep their background).
+
+    Yields (level, x, y, Drawing) tuples.
+    """
+    scale, _, positions = layout_shapes(px_size, scale, images)
+    for shape, shape_pos in zip(images, positions):
         if with_canvas:
             shape_pos.x -= 0.05
         shape.move(shape_pos)
-        shape.draw(dwg, unit=unit)
-        shape.move(-shape_pos)
 
-    return dwg
+    try:
+        for level in range(levels):
+            zoom = 2 ** (level - levels + 1)
+            unit = scale * zoom
+            level_size = px_size * zoom
+            detail = level == levels - 1
+            skip = set() if detail else (test_pads or set())
+            leaves = [
+                (leaf, leaf.pos1 * unit, leaf.pos2 * unit)
+                for shape in images
+                for leaf in iter_leaf_shapes(shape, skip)
+            ]
+            # keep shapes slightly outside the tile, as text overflows its bbox
+            margin = tile_size / 4
+
+            for ty in range(ceil(level_size.y / tile_size)):
+                for tx in range(ceil(level_size.x / tile_size)):
+                    tile1 = V(tx, ty) * tile_size - margin
+                    tile2 = V(tx + 1, ty + 1) * tile_size + margin
+
+                    with DRAW_LOCK:
+                        AutoID._set_value(1)
+                        dwg = Drawing(size=(tile_size, tile_size))
+                        dwg.viewbox(
+                            minx=tx * tile_size,
+                            miny=ty * tile_size,
+                            width=tile_size,
+                            height=tile_size,
+                        )
+                        if with_canvas:
+                            # clip the canvas to the tile; its outline is only
+                            # drawn where the tile touches the canvas edge
+                            stroke = 0.1 * unit
+                            bg1 = V(tx, ty) * tile_size - stroke
+                            bg2 = V(tx + 1, ty + 1) * tile_size + stroke
+                            bg1 = V(max(bg1.x, 0), max(bg1.y, 0))
+                            bg2 = V(min(bg2.x, level_size.x), min(bg2.y, level_size.y))
+                            bg = shapes.Rect(insert=bg1.tuple, size=(bg2 - bg1).tuple)
+                            bg.fill(color="white")
+                            bg.stroke(color="black", width=stroke)
+                            dwg.add(bg)
+
+                        for leaf, pos1, pos2 in leaves:
+                            if pos2.x < tile1.x or pos1.x > tile2.x:
+                                continue
+                            if pos2.y < tile1.y or pos1.y > tile2.y:
+                                continue
+                            draw_lod(dwg, leaf, unit, min_text_px, detail)
+                    yield level, tx, ty, dwg
+    finally:
+        for shape, shape_pos in zip(images, positions):
+            shape.move(-shape_pos)
+
+
+def draw_lod(
+    dwg: Drawing,
+    shape: Shape,
+    unit: float,
+    min_text_px: float,
+    detail: bool,
+) -> None:
+    match shape:
+        case Block():
+            shape.draw_background(dwg, unit)
+            if shape.label_size * 0.6 * unit >= min_text_px:
+                shape.draw_text(dwg, unit, negation=detail)
+        case Text():
+            if shape.font_size * unit >= min_text_px:
+                shape.draw(dwg, unit)
+        case _:
+            shape.draw(dwg, unit)
+
+
+def draw_gallery(
+    cell_size: V,
+    columns: int,
+    items: list[tuple[str, str | None, Shape]],
+) -> Drawing:
+    """Lay out already-built shapes in a grid of equally sized cells.
+
+    Args:
+        cell_size (V): Size of a single cell (px).
+        columns (int): Number of grid columns.
+        items (list): (title, link or None, shape) tuples, one per cell.
+    """
+    with DRAW_LOCK:
+        AutoID._set_value(1)
+        rows = max(1, ceil(len(items) / columns))
+        px_size = V(cell_size.x * min(columns, max(1, len(items))), cell_size.y * rows)
+        dwg = Drawing(size=px_size.tuple)
+        dwg.viewbox(width=px_size.x, height=px_size.y)
+
+        bg = shapes.Rect(insert=(0, 0), size=px_size.tuple)
+        bg.fill(color="white")
+        dwg.add(bg)
+
+        font_size = cell_size.y * 0.06
+        # leave space for the title below each image
+        area_size = V(cell_size.x, cell_size.y - font_size * 2)
+
+        for i, (title, link, shape) in enumerate(items):
+            cell_pos = V((i % columns) * cell_size.x, (i // columns) * cell_size.y)
+            size_pad = area_size * 0.90  # 5% padding from each side
+            size = shape.size
+            scale = min(size_pad.x / size.x, size_pad.y / size.y)
+
+            cell = Hyperlink(href=link, target="_top") if link else Group()
+            shape_pos = ((area_size / scale) - size) / 2
+            shape_pos += cell_pos / scale
+            shape_pos -= shape.pos1
+            shape.move(shape_pos)
+            shape.draw(cell, unit=scale)
+            shape.move(-shape_pos)
+
+            txt = text.Text(
+                text=title,
+                insert=(
+                    cell_pos.x + cell_size.x / 2,
+                    cell_pos.y + cell_size.y - font_size,
+                ),
+                font_family="Consolas",
+                font_size=font_size,
+                text_anchor="middle",
+            )
+            txt.fill(color="black")
+            cell.add(txt)
+            dwg.add(cell)
+
+        return dwg
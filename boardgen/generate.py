@@ -0,0 +1,216 @@
+#  Copyright (c) Kuba Szczodrzyński 2026-10-19.
+
+from os.path import isfile, join
+from time import perf_counter
+from typing import TYPE_CHECKING, Callable
+
+from .core import Core
+from .lock import LOCK_FILE, BuildLock, InputTracker
+from .output import (
+    DOCS_OUTPUTS,
+    VARIANT_OUTPUTS,
+    OutputWriter,
+    get_output_path,
+    hash_content,
+)
+
+if TYPE_CHECKING:
+    from .models import Board
+
+
+class BoardGenerator:
+    """Render boards and save their outputs, i.e. for 'boardgen all' and
+    'boardgen ltci'. Can be used in-process, with an already-warm Core.
+
+    Args:
+        core (Core): Core to build the boards with.
+        log (Callable[[str], None], optional): Message output (print).
+        on_progress (Callable[[int, int, str], None], optional): Called
+            before each board with (index, total, board_name).
+        should_run (Callable[[], bool], optional): Checked before each board;
+            generation stops when it returns False.
+    """
+
+    core: Core
+
+    def __init__(
+        self,
+        core: Core,
+        log: Callable[[str], None] = print,
+        on_progress: Callable[[int, int, str], None] = None,
+        should_run: Callable[[], bool] = None,
+    ) -> None:
+        self.core = core
+        self.log = log
+        self.on_progress = on_progress
+        self.should_run = should_run
+
+    def save_file(self, files: OutputWriter, path: str, content: str | bytes) -> None:
+        with self.core.stage("save"):
+            written = files.write(path, content)
+        if written:
+            self.log(f"Saved '{path}'")
+
+    def save_outputs(
+        self,
+        board: "Board",
+        outputs: dict[str, str | bytes],
+        output: str,
+        subdir: bool,
+        files: OutputWriter,
+        names: list[str] = None,
+    ) -> dict[str, str]:
+        """Save rendered outputs; remove files of the expected outputs
+        (names) which were not rendered for this board.
+
+        Returns the saved paths with content hashes.
+        """
+        saved = {}
+        for name in names or outputs.keys():
+            path = get_output_path(board, name, output, subdir)
+            if name in outputs:
+                self.save_file(files, path, outputs[name])
+                saved[path] = hash_content(outputs[name])
+            elif files.remove(path):
+                self.log(f"Removed '{path}'")
+        return saved
+
+    def generate(
+        self,
+        boards: list[str],
+        targets: list[tuple[list[str], str, bool]],
+        lock_path: str = None,
+        incremental: bool = False,
+        index_path: str = None,
+        index_link: str = None,
+    ) -> bool:
+        """Render boards one at a time and save the outputs into targets.
+
+        Args:
+            boards (list[str]): Board names, or ["all"].
+            targets (list[tuple[list[str], str, bool]]): Output names to save,
+                with the output directory and the 'subdir' flag of each.
+            lock_path (str, optional): Lockfile to write inputs/outputs to.
+            incremental (bool, optional): Skip boards which are up to date
+                according to the lockfile.
+            index_path (str, optional): Also write a table of the boards
+                (.md, .json or .csv).
+            index_link (str, optional): Board link format of the .md table.
+
+        Returns:
+            bool: False if stopped by should_run (the lockfile is still saved
+            with the finished boards, the index is not written).
+        """
+        from .readme.index import IndexWriter
+
+        core = self.core
+        if boards and boards[0] == "all":
+            boards = sorted(core.list_json("boards"))
+        if incremental and not lock_path:
+            lock_path = LOCK_FILE
+        lock = BuildLock(core, lock_path) if lock_path else None
+        stages = [
+            ("svg", ["svg"]),
+            ("readme", ["readme"]),
+            ("variant", VARIANT_OUTPUTS),
+        ]
+        wanted = set(sum((names for names, _, _ in targets), []))
+        index = IndexWriter(core) if index_path else None
+        finished = True
+
+        files = OutputWriter()
+        with InputTracker(core) as tracker:
+            for i, name in enumerate(boards):
+                if self.should_run and not self.should_run():
+                    self.log("Stopped")
+                    finished = False
+                    break
+                if self.on_progress:
+                    self.on_progress(i, len(boards), name)
+                if incremental and lock.is_up_to_date(name):
+                    self.log(f"Board '{name}' is up to date")
+                    if index:
+                        index.add(name)
+                    continue
+                tracker.start()
+                timings = {}
+
+                self.log(f"Loading board '{name}'...")
+                start = perf_counter()
+                board = core.get_board(name)
+                timings["build"] = perf_counter() - start
+
+                outputs = {}
+                for stage, names in stages:
+                    names = [n for n in names if n in wanted]
+                    if not names:
+                        continue
+                    start = perf_counter()
+                    outputs.update(core.render(board, outputs=names))
+                    timings[stage] = perf_counter() - start
+
+                start = perf_counter()
+                saved = {}
+                for names, output, subdir in targets:
+                    saved |= self.save_outputs(
+                        board, outputs, output, subdir, files, names
+                    )
+                timings["save"] = perf_counter() - start
+
+                if lock:
+                    lock.update(name, tracker.files, saved, timings)
+                if index:
+                    index.add(name)
+        if index and finished:
+            fmt = IndexWriter.get_format(index_path)
+            self.save_file(files, index_path, index.format(fmt, index_link))
+        if lock:
+            lock.save()
+            self.log(f"Saved lockfile '{lock.path}'")
+        self.log(f"Output files: {files.summary}")
+        return finished
+
+    def ltci(
+        self,
+        boards: list[str] = None,
+        root: str = None,
+        no_docs: bool = False,
+        lock_path: str = None,
+        incremental: bool = False,
+        index_path: str = None,
+    ) -> bool:
+        """Generate board files for LibreTiny CI.
+
+        Args:
+            boards (list[str], optional): Board names (default: all).
+            root (str, optional): LibreTiny root directory (default: CWD);
+                relative output/lockfile/index paths are based on it.
+            no_docs (bool, optional): Write variant files only.
+            lock_path (str, optional): Lockfile to write inputs/outputs to.
+            incremental (bool, optional): Skip boards up to date
+                in the lockfile.
+            index_path (str, optional): Also write a table of the boards.
+
+        Returns:
+            bool: False if stopped by should_run.
+        """
+
+        def path(p: str | None) -> str | None:
+            return join(root, p) if root and p else p
+
+        if not isfile(path("families.json")):
+            raise ValueError(f"'{root or '.'}' is not a LibreTiny directory")
+        if incremental and not lock_path:
+            lock_path = LOCK_FILE
+
+        targets = [(VARIANT_OUTPUTS, path("boards/variants/"), False)]
+        if not no_docs:
+            targets.insert(0, (DOCS_OUTPUTS, path("boards/"), True))
+        return self.generate(
+            boards or ["all"],
+            targets=targets,
+            lock_path=path(lock_path),
+            incremental=incremental,
+            index_path=path(index_path),
+            index_link="{id}/README.md",
+        )
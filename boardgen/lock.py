@@ -0,0 +1,133 @@
+#  Copyright (c) Kuba Szczodrzyński 2026-10-19.
+
+import json
+from os.path import abspath, dirname, isfile, join, relpath
+
+from .core import Core
+from .output import OutputWriter, hash_file
+from .utils import load_json
+
+LOCK_FILE = "boardgen.lock.json"
+# prefix of paths inside boardgen's own resource directory
+RES_PREFIX = "<boardgen>/"
+
+
+class InputTracker:
+    """Record the JSON files loaded by Core while building a board."""
+
+    core: Core
+    files: set[str]
+
+    def __init__(self, core: Core) -> None:
+        self.core = core
+        self.files = set()
+        self._prev_hook = None
+
+    def __enter__(self) -> "InputTracker":
+        self._prev_hook = self.core.json_hook
+        self.core.json_hook = self.json_hook
+        return self
+
+    def __exit__(self, *_) -> None:
+        self.core.json_hook = self._prev_hook
+
+    def start(self) -> None:
+        # presets, roles, flash regions and families are used by every board,
+        # but they're loaded (and reported to json_hook) only once
+        self.files = {abspath(file) for file in self.core.res_files}
+
+    def json_hook(self, type: str, name: str, data, file: str | None) -> None:
+        if self._prev_hook:
+            self._prev_hook(type, name, data, file)
+        if not file:
+            # loaded from cache - find the file it came from
+            for dir in self.core.get_dirs(type):
+                path = join(dir, f"{name}.json")
+                if isfile(path):
+                    file = path
+                    break
+        if file:
+            self.files.add(abspath(file))
+
+
+class BuildLock:
+    """Manifest of each board's input/output file hashes and stage timings."""
+
+    path: str
+    version: str | None
+    # { board_name: { "inputs": {path: hash}, "outputs": {...}, "timings": {...} } }
+    boards: dict[str, dict[str, dict]]
+
+    def __init__(self, core: Core, path: str = LOCK_FILE) -> None:
+        self.core = core
+        self.path = path
+        self.version = core.version
+        self.boards = {}
+        if isfile(path):
+            data = load_json(path)
+            self.lock_version = data.get("version", None)
+            self.boards = data.get("boards", {})
+        else:
+            self.lock_version = None
+
+    def _rel(self, path: str) -> str:
+        path = abspath(path)
+        dir_base = abspath(self.core.dir_base)
+        if path.startswith(join(dir_base, "")):
+            path = RES_PREFIX + relpath(path, dir_base)
+        else:
+            path = relpath(path, dirname(abspath(self.path)))
+        return path.replace("\\", "/")
+
+    def _abs(self, path: str) -> str:
+        if path.startswith(RES_PREFIX):
+            return join(self.core.dir_base, path[len(RES_PREFIX) :])
+        return join(dirname(abspath(self.path)), path)
+
+    def get_stale_files(self, name: str) -> list[str] | None:
+        """Return the board's files whose hash doesn't match the lockfile.
+
+        Returns None if the board is not in the lockfile (or the lockfile
+        was generated by a different boardgen version).
+        """
+        entry = self.boards.get(name, None)
+        if not entry or self.lock_version != self.version:
+            return None
+        stale = []
+        for key in ["inputs", "outputs"]:
+            for path, digest in entry.get(key, {}).items():
+                if hash_file(self._abs(path)) != digest:
+                    stale.append(path)
+        return stale
+
+    def is_up_to_date(self, name: str) -> bool:
+        return self.get_stale_files(name) == []
+
+    def update(
+        self,
+        name: str,
+        inputs: set[str],
+        outputs: dict[str, str],
+        timings: dict[str, float],
+    ) -> None:
+        """Store a board's entry.
+
+        Args:
+            name (str): Board name.
+            inputs (set[str]): Input file paths.
+            outputs (dict[str, str]): Output file paths with content hashes.
+            timings (dict[str, float]): Stage durations in seconds.
+        """
+        self.boards[name] = dict(
+            inputs={self._rel(path): hash_file(path) for path in sorted(inputs)},
+            outputs={self._rel(path): digest for path, digest in outputs.items()},
+            timings={stage: round(t, 4) for stage, t in timings.items()},
+        )
+
+    def save(self) -> None:
+        data = dict(
+            version=self.version,
+            boards={name: self.boards[name] for name in sorted(self.boards)},
+        )
+        OutputWriter().write(self.path, json.dumps(data, indent="\t") + "\n")
+        self.lock_version = self.version
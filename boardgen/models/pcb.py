@@ -1,5 +1,6 @@
 # Copyright (c) Kuba Szczodrzyński 2022-05-11.
 
+from pydantic import PrivateAttr
 from svgwrite import Drawing
 
 from ..mixins import HasId, HasVars
@@ -25,6 +26,8 @@ class Pcb(Model, HasId, HasVars):
     drawing_hidden: str = ""
 
     shapes: dict[Side, ShapeGroup] = {}
+    # PinIndex, built by Core.get_pin_index()
+    _pin_index = PrivateAttr(None)
 
     def get_pos(self, side: Side) -> tuple[V, V]:
         shape = self.shapes[side]
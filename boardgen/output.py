@@ -0,0 +1,103 @@
+#  Copyright (c) Kuba Szczodrzyński 2026-10-19.
+
+import os
+from hashlib import sha256
+from os.path import dirname, isfile, join
+from threading import Lock
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from .models import Board
+
+DOCS_OUTPUTS = ["svg", "readme"]
+VARIANT_OUTPUTS = ["variant_h", "variant_c"]
+ALL_OUTPUTS = DOCS_OUTPUTS + VARIANT_OUTPUTS
+
+
+def content_bytes(content: str | bytes) -> bytes:
+    if isinstance(content, bytes):
+        return content
+    # same as writing in text mode
+    return content.replace("\n", os.linesep).encode("utf-8")
+
+
+def hash_content(content: str | bytes) -> str:
+    return sha256(content_bytes(content)).hexdigest()
+
+
+def hash_file(path: str) -> str | None:
+    if not isfile(path):
+        return None
+    with open(path, "rb") as f:
+        return sha256(f.read()).hexdigest()
+
+
+def get_output_path(board: "Board", name: str, output: str, subdir: bool) -> str:
+    if subdir:
+        file = {
+            "svg": f"{board.id}.svg",
+            "png": f"{board.id}.png",
+            "readme": "README.md",
+            "variant_h": "variant.h",
+            "variant_c": "variant.c",
+        }[name]
+        return join(output, board.id, file)
+    ext = {
+        "readme": "md",
+        "variant_h": "h",
+        "variant_c": "c",
+    }.get(name, name)
+    return join(output, f"{board.id}.{ext}")
+
+
+class OutputWriter:
+    """Write output files atomically, skipping files whose content
+    would not change. Keeps count of written, unchanged and removed files.
+    """
+
+    written: int
+    unchanged: int
+    removed: int
+
+    def __init__(self) -> None:
+        self.written = 0
+        self.unchanged = 0
+        self.removed = 0
+        self._lock = Lock()
+
+    def write(self, path: str, content: str | bytes) -> bool:
+        """Write the file, unless it already has the same content.
+
+        Returns True if the file was written.
+        """
+        data = content_bytes(content)
+        if hash_file(path) == sha256(data).hexdigest():
+            with self._lock:
+                self.unchanged += 1
+            return False
+        os.makedirs(dirname(path) or ".", exist_ok=True)
+        # write next to the target and swap, so readers never see a partial file
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+        with self._lock:
+            self.written += 1
+        return True
+
+    def remove(self, path: str) -> bool:
+        """Remove a stale output file, if it exists."""
+        if not isfile(path):
+            return False
+        os.unlink(path)
+        with self._lock:
+            self.removed += 1
+        return True
+
+    @property
+    def summary(self) -> str:
+        return (
+            f"{self.written} written, "
+            f"{self.unchanged} unchanged, "
+            f"{self.removed} removed"
+        )
@@ -0,0 +1,156 @@
+#  Copyright (c) Kuba Szczodrzyński 2026-10-19.
+
+import re
+from typing import TYPE_CHECKING
+
+from .models.enums import RoleType, RoleValue
+from .models.pcb import Pcb, PinDict
+
+# (indexed) communication ports, as used in variant files
+PORT_ROLES = [RoleType.SPI, RoleType.I2C, RoleType.UART]
+
+if TYPE_CHECKING:
+    from .core import Core
+
+
+class PinIndex:
+    """Pinout of a PCB, parsed once and shared by the labels,
+    README and variant writers. Use Core.get_pin_index() to get one.
+    """
+
+    core: "Core"
+    pins: dict[str, PinDict]
+    # { role_type: {function names, or port indexes} }
+    role_pins: dict[RoleType, set[str]]
+    # { gpio_name: pin } - pins with a GPIO role
+    gpio_pins: dict[str, PinDict]
+    # GPIO numbers - see numbers, arduino_names, gpio_map and ports
+    _numbers: dict[str, tuple[str, str, int]] | None = None
+
+    def __init__(self, core: "Core", pcb: Pcb) -> None:
+        self.core = core
+        self.pins = pcb.pinout
+        self.role_pins = {}
+        self.gpio_pins = {}
+        self._texts = {}
+
+        for pin in self.pins.values():
+            for role_type, functions in pin.items():
+                role_pins = self.role_pins.setdefault(role_type, set())
+                for function in self.functions(functions):
+                    # count "1_TX" as port 1
+                    if function[0].isnumeric() and len(function) > 2:
+                        if function[1] == "_":
+                            function = function[0]
+                    role_pins.add(function)
+            if RoleType.GPIO in pin:
+                self.gpio_pins[pin[RoleType.GPIO]] = pin
+
+    @property
+    def numbers(self) -> dict[str, tuple[str, str, int]]:
+        """{ pin: (name, c_name, number) } - pins with a GPIO or ADC role."""
+        if self._numbers is None:
+            self._read_numbers()
+        return self._numbers
+
+    @property
+    def arduino_names(self) -> dict[str, str]:
+        """{ pin: arduino_name } - pins with an Arduino name."""
+        if self._numbers is None:
+            self._read_numbers()
+        return self._arduino_names
+
+    @property
+    def gpio_map(self) -> dict[int, str]:
+        """{ gpio_number: arduino_name }"""
+        if self._numbers is None:
+            self._read_numbers()
+        return self._gpio_map
+
+    @property
+    def ports(self) -> dict[RoleType, dict[int, dict[str, list[int]]]]:
+        """{ role_type: { index: { signal: [...pin_numbers] } } }"""
+        if self._numbers is None:
+            self._read_numbers()
+        return self._ports
+
+    def _read_numbers(self) -> None:
+        # only needed by the variant writer - parsed on first use, so that
+        # drawing doesn't fail on pins without a GPIO number
+        numbers = {}
+        self._arduino_names = {}
+        self._gpio_map = {}
+        self._ports = {role_type: {} for role_type in PORT_ROLES}
+
+        for pin_id, pin in self.pins.items():
+            pin_tuple = self.read_pin(pin)
+            if not pin_tuple:
+                continue
+            numbers[pin_id] = pin_tuple
+            number = pin_tuple[2]
+
+            arduino_name = pin.get(RoleType.ARD_D, None)
+            arduino_name = arduino_name or pin.get(RoleType.ARD_A, None)
+            if not arduino_name:
+                continue
+            self._arduino_names[pin_id] = arduino_name
+            self._gpio_map[number] = arduino_name
+
+            # find all indexed interfaces this pin belongs to
+            for role_type in PORT_ROLES:
+                if role_type not in pin:
+                    continue
+                for function in self.functions(pin[role_type]):
+                    # require "1_RX" format
+                    (index, _, port) = function.partition("_")
+                    if index and port and index.isnumeric():
+                        index = int(index)
+                    else:
+                        index = 0
+                        port = function
+                    signals = self._ports[role_type].setdefault(index, {})
+                    signals.setdefault(port, []).append(number)
+        self._numbers = numbers
+
+    @staticmethod
+    def functions(functions: RoleValue) -> list[str]:
+        if not isinstance(functions, list):
+            return [str(functions)]
+        return functions
+
+    @staticmethod
+    def read_pin(pin: PinDict) -> tuple[str, str, int] | None:
+        name = pin.get(RoleType.GPIO, None) or pin.get(RoleType.ADC, None)
+        c_name = pin.get(RoleType.C_NAME, name)
+        if not name:
+            return None
+        number = pin.get(RoleType.GPIONUM, None)
+        if number is not None:
+            return name, c_name, int(number)
+        number = re.sub(r"\D", "", name)
+        return name, c_name, int(number)
+
+    def format(
+        self,
+        role_type: RoleType,
+        functions: RoleValue,
+        long: bool = False,
+        hidden: list[str] = None,
+        safe: bool = False,
+    ) -> list[str]:
+        """Role.format(), memoized. Returns [] for unknown roles."""
+        key = (
+            role_type,
+            tuple(functions) if isinstance(functions, list) else functions,
+            long,
+            tuple(hidden or []),
+            safe,
+        )
+        if key not in self._texts:
+            role = self.core.role(role_type)
+            if not role:
+                self._texts[key] = []
+            else:
+                self._texts[key] = role.format(functions, long, hidden, safe)
+        # return a copy, as the callers may modify it
+        return list(self._texts[key])
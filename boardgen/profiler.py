@@ -0,0 +1,136 @@
+#  Copyright (c) Kuba Szczodrzyński 2026-10-19.
+
+import json
+import sys
+import threading
+from contextlib import contextmanager
+from dataclasses import dataclass
+from time import perf_counter
+from typing import Generator
+
+
+@dataclass
+class StageEvent:
+    name: str
+    board: str | None
+    thread: int
+    start: float
+    duration: float
+    # time spent in this stage only, without nested stages
+    self_time: float
+    # net change of allocated memory blocks
+    blocks: int
+    # whether it's nested within another stage of the same name
+    recursive: bool
+
+
+class Profiler:
+    """Record the duration and memory block allocations of build stages.
+
+    Stages may be nested; the summary reports both the total time of
+    a stage and its self time (excluding nested stages).
+    """
+
+    events: list[StageEvent]
+
+    def __init__(self) -> None:
+        self.events = []
+        self.origin = perf_counter()
+        self._local = threading.local()
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def stage(self, name: str, board: str = None) -> Generator[None, None, None]:
+        """Measure the enclosed code as a stage.
+
+        Args:
+            name (str): Stage name.
+            board (str, optional): Board being processed; it's used
+                for this and all subsequent stages of the calling thread.
+        """
+        if board:
+            self._local.board = board
+        # [name, time of nested stages] of each active stage
+        stack: list[list] = self._local.__dict__.setdefault("stack", [])
+        stack.append([name, 0.0])
+        blocks = sys.getallocatedblocks()
+        start = perf_counter()
+        try:
+            yield
+        finally:
+            duration = perf_counter() - start
+            event = StageEvent(
+                name=name,
+                board=getattr(self._local, "board", None),
+                thread=threading.get_ident(),
+                start=start - self.origin,
+                duration=duration,
+                self_time=duration - stack.pop()[1],
+                blocks=sys.getallocatedblocks() - blocks,
+                recursive=any(entry[0] == name for entry in stack),
+            )
+            if stack:
+                stack[-1][1] += duration
+            with self._lock:
+                self.events.append(event)
+
+    def get_stages(self) -> dict[str, dict[str, float]]:
+        stages = {}
+        for event in self.events:
+            stage = stages.setdefault(
+                event.name,
+                dict(calls=0, self_time=0.0, total_time=0.0, blocks=0),
+            )
+            stage["calls"] += 1
+            stage["self_time"] += event.self_time
+            stage["blocks"] += event.blocks
+            # don't count recursive calls twice
+            if not event.recursive:
+                stage["total_time"] += event.duration
+        return dict(sorted(stages.items(), key=lambda i: -i[1]["self_time"]))
+
+    def get_boards(self) -> dict[str, float]:
+        boards = {}
+        for event in self.events:
+            if event.board:
+                boards[event.board] = boards.get(event.board, 0.0) + event.self_time
+        return dict(sorted(boards.items(), key=lambda i: -i[1]))
+
+    @property
+    def summary(self) -> str:
+        lines = [
+            f"{'Stage':<16} {'Calls':>7} {'Self (ms)':>11} "
+            f"{'Total (ms)':>11} {'Blocks':>10}"
+        ]
+        for name, stage in self.get_stages().items():
+            lines.append(
+                f"{name:<16} {stage['calls']:>7} "
+                f"{stage['self_time'] * 1000:>11.2f} "
+                f"{stage['total_time'] * 1000:>11.2f} "
+                f"{stage['blocks']:>+10}"
+            )
+        boards = self.get_boards()
+        if boards:
+            lines.append("")
+            lines.append(f"{'Board':<32} {'Time (ms)':>11}")
+            for name, took in boards.items():
+                lines.append(f"{name:<32} {took * 1000:>11.2f}")
+        return "\n".join(lines)
+
+    def save_trace(self, path: str) -> None:
+        """Write the events in Chrome's Trace Event format (chrome://tracing)."""
+        events = [
+            dict(
+                name=event.name,
+                cat=event.board or "boardgen",
+                ph="X",
+                ts=round(event.start * 1e6, 3),
+                dur=round(event.duration * 1e6, 3),
+                pid=0,
+                tid=event.thread,
+                args=dict(board=event.board, blocks=event.blocks),
+            )
+            for event in self.events
+        ]
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(dict(traceEvents=events, displayTimeUnit="ms"), f)
@@ -0,0 +1,103 @@
+#  Copyright (c) Kuba Szczodrzyński 2026-10-19.
+
+from concurrent.futures import Future, ThreadPoolExecutor
+from functools import cache
+from typing import Any, Callable
+
+from svgwrite import Drawing
+
+from .vector import V
+
+RasterFunc = Callable[[str, V], bytes]
+
+
+@cache
+def get_rasterizer() -> RasterFunc | None:
+    """Find an installed SVG->PNG backend (resvg-py or cairosvg).
+
+    The lookup is done once per process; returns None if no backend
+    is available.
+    """
+    try:
+        import resvg_py
+
+        def render(svg: str, px_size: V) -> bytes:
+            return bytes(
+                resvg_py.svg_to_bytes(
+                    svg_string=svg,
+                    width=int(px_size.x),
+                    height=int(px_size.y),
+                )
+            )
+
+        return render
+    except ImportError:
+        pass
+
+    try:
+        import cairosvg
+
+        def render(svg: str, px_size: V) -> bytes:
+            return cairosvg.svg2png(
+                bytestring=svg.encode(),
+                output_width=int(px_size.x),
+                output_height=int(px_size.y),
+            )
+
+        return render
+    except (ImportError, OSError):
+        # cairosvg raises OSError if libcairo is missing
+        pass
+    return None
+
+
+class Rasterizer:
+    """Convert in-memory Drawings to PNG files in a thread pool."""
+
+    func: RasterFunc
+    save: Callable[[str, bytes], Any] | None
+    executor: ThreadPoolExecutor
+    futures: list[Future]
+
+    def __init__(
+        self,
+        jobs: int = None,
+        save: Callable[[str, bytes], Any] = None,
+    ) -> None:
+        func = get_rasterizer()
+        if not func:
+            raise RuntimeError(
+                "PNG output requires an SVG rasterizer; "
+                "install 'resvg-py' or 'cairosvg'"
+            )
+        self.func = func
+        self.save = save
+        self.executor = ThreadPoolExecutor(max_workers=jobs)
+        self.futures = []
+
+    def render(self, dwg: Drawing, px_size: V) -> bytes:
+        return self.func(dwg.tostring(), px_size)
+
+    def submit(self, dwg: Drawing, px_size: V, output: str) -> Future:
+        # serialize on the calling thread - svgwrite is not thread-safe
+        svg = dwg.tostring()
+        future = self.executor.submit(self._save, svg, px_size, output)
+        self.futures.append(future)
+        return future
+
+    def _save(self, svg: str, px_size: V, output: str) -> None:
+        data = self.func(svg, px_size)
+        if self.save:
+            self.save(output, data)
+            return
+        with open(output, "wb") as f:
+            f.write(data)
+
+    def close(self) -> None:
+        futures = self.futures
+        self.futures = []
+        try:
+            for future in futures:
+                future.result()
+        finally:
+            self.executor.shutdown(wait=True)
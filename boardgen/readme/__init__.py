@@ -1,7 +1,9 @@
 # Copyright (c) Kuba Szczodrzyński 2022-05-14.
 
+from .index import IndexWriter
 from .writer import ReadmeWriter
 
 __all__ = [
     "ReadmeWriter",
+    "IndexWriter",
 ]
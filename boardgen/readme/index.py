@@ -0,0 +1,99 @@
+#  Copyright (c) Kuba Szczodrzyński 2026-10-19.
+
+import csv
+import json
+from io import StringIO
+
+from ..core import Core
+from .parts import ReadmeParts
+
+# (meta key, column title)
+INDEX_COLUMNS = [
+    ("name", "Name"),
+    ("id", "Code"),
+    ("family", "Family"),
+    ("mcu", "MCU"),
+    ("cpu_freq", "Frequency"),
+    ("flash", "Flash"),
+    ("ram", "RAM"),
+    ("pin_count", "Pins"),
+    ("gpio_count", "GPIOs"),
+    ("connectivity", "Connectivity"),
+    ("vendor", "Vendor"),
+]
+
+INDEX_FORMATS = ["md", "json", "csv"]
+
+
+class IndexWriter(ReadmeParts):
+    """Table of all boards, built from the board metadata
+    (Core.get_board_meta()), i.e. the already-loaded manifests.
+    """
+
+    core: Core
+    items: list[str] = []
+    # { board_name: meta }
+    boards: dict[str, dict]
+
+    def __init__(self, core: Core) -> None:
+        self.core = core
+        self.items = []
+        self.boards = {}
+
+    def add(self, name: str) -> None:
+        self.boards[name] = self.core.get_board_meta(name)
+
+    @property
+    def rows(self) -> list[dict]:
+        return [self.boards[name] for name in sorted(self.boards)]
+
+    @staticmethod
+    def get_format(path: str) -> str:
+        ext = path.rpartition(".")[2].lower()
+        return ext if ext in INDEX_FORMATS else "md"
+
+    @staticmethod
+    def get_text(meta: dict, key: str) -> str:
+        value = meta.get(key, None)
+        if value is None:
+            return ""
+        if isinstance(value, list):
+            return ", ".join(str(v) for v in value)
+        if key == "mcu":
+            return value.upper()
+        return str(value)
+
+    def format(self, fmt: str, link: str = None) -> str:
+        return {
+            "md": lambda: self.format_md(link),
+            "json": self.format_json,
+            "csv": self.format_csv,
+        }[fmt]()
+
+    def format_md(self, link: str = None) -> str:
+        """Format the index as a markdown table.
+
+        Args:
+            link (str, optional): Board link format, '{id}' is the board code.
+        """
+        self.items = []
+        header = [title for _, title in INDEX_COLUMNS]
+        rows = []
+        for meta in self.rows:
+            row = [self.get_text(meta, key) for key, _ in INDEX_COLUMNS]
+            if link:
+                row[0] = self.get_link(row[0], link.format(id=meta["id"]))
+            rows.append(row)
+        self.add_table(header, *rows)
+        return "\n\n".join(self.items) + "\n"
+
+    def format_json(self) -> str:
+        return json.dumps(self.rows, indent="\t") + "\n"
+
+    def format_csv(self) -> str:
+        out = StringIO()
+        writer = csv.writer(out, lineterminator="\n")
+        writer.writerow([title for _, title in INDEX_COLUMNS])
+        for meta in self.rows:
+            writer.writerow([self.get_text(meta, key) for key, _ in INDEX_COLUMNS])
+        return out.getvalue()
@@ -6,11 +6,14 @@ from abc import ABC
 class ReadmeParts(ABC):
     items: list[str]
 
+    def add_item(self, item: str) -> None:
+        self.items.append(item)
+
     def pad(self, s: str, i: int) -> str:
         return s + " " * (i - len(s))
 
     def add_heading(self, text: str, level: int = 1) -> "ReadmeParts":
-        self.items.append(level * "#" + " " + text)
+        self.add_item(level * "#" + " " + text)
         return self
 
     def get_link(self, text: str, href: str) -> str:
@@ -20,24 +23,24 @@ class ReadmeParts(ABC):
         return f"![{alt}]({src})"
 
     def add_link(self, text: str, href: str) -> "ReadmeParts":
-        self.items.append(self.get_link(text, href))
+        self.add_item(self.get_link(text, href))
         return self
 
     def add_img(self, alt: str, src: str) -> "ReadmeParts":
-        self.items.append(self.get_img(alt, src))
+        self.add_item(self.get_img(alt, src))
         return self
 
     def add_text(self, *text: str) -> "ReadmeParts":
-        self.items.append(" ".join(text))
+        self.add_item(" ".join(text))
         return self
 
     def add_styled(self, style: str, *text: str) -> "ReadmeParts":
-        self.items.append(style + " ".join(text) + style)
+        self.add_item(style + " ".join(text) + style)
         return self
 
     def add_list(self, *items: list[str]) -> "ReadmeParts":
         items = [" ".join(i) for i in items]
-        self.items.append("- " + "\n- ".join(items))
+        self.add_item("- " + "\n- ".join(items))
         return self
 
     def add_code(self, code: str | list[str], lang: str = None) -> "ReadmeParts":
@@ -45,7 +48,7 @@ class ReadmeParts(ABC):
             code = "\n".join(code)
         if not lang:
             lang = ""
-        self.items.append(f"```{lang}\n{code}\n```")
+        self.add_item(f"```{lang}\n{code}\n```")
 
     def add_table(self, header: list[str], *rows: list[str]) -> "ReadmeParts":
         maxlen = [len(h) for h in header]
@@ -63,5 +66,5 @@ class ReadmeParts(ABC):
             row = [self.pad(h, maxlen[i]) for i, h in enumerate(row)]
             line = " | ".join(row)
             lines.append(line.rstrip())
-        self.items.append("\n".join(lines))
+        self.add_item("\n".join(lines))
         return self
@@ -1,7 +1,9 @@
 # Copyright (c) Kuba Szczodrzyński 2022-05-14.
 
+import json
 import os
 from os.path import dirname
+from typing import Callable, TextIO
 
 from natsort import natsorted
 
@@ -10,19 +12,58 @@ from ..models import Board
 from ..models.board import BoardDoc, BoardDocParams
 from ..models.enums import RoleType
 from ..models.flash_region import FlashRegion
+from ..output import hash_content
 from .parts import ReadmeParts
 
 
 class ReadmeWriter(ReadmeParts):
     core: Core
     items: list[str] = []
+    # write sections to this stream, instead of collecting items
+    stream: TextIO | None
+    count: int = 0
 
-    def __init__(self, core: Core) -> None:
+    def __init__(self, core: Core, stream: TextIO = None) -> None:
         self.core = core
         self.items = []
+        self.stream = stream
+        self.count = 0
+        self._fragments = None
 
     def clear(self):
         self.items = []
+        self.count = 0
+
+    def add_item(self, item: str) -> None:
+        if self._fragments is not None:
+            self._fragments.append(item)
+            return
+        if self.stream:
+            if self.count:
+                self.stream.write("\n\n")
+            self.stream.write(item)
+        else:
+            self.items.append(item)
+        self.count += 1
+
+    def add_cached(self, inputs: list, build: Callable[[], None]) -> None:
+        """Add the items of a section, memoized by a hash of its inputs.
+
+        Args:
+            inputs (list): JSON-serializable section name and inputs.
+            build (Callable[[], None]): Function adding the section's items.
+        """
+        key = hash_content(json.dumps(inputs, sort_keys=True, default=str))
+        cache = self.core._cache["readme"]
+        if key not in cache:
+            self._fragments = []
+            try:
+                build()
+            finally:
+                fragments, self._fragments = self._fragments, None
+            cache[key] = fragments
+        for item in cache[key]:
+            self.add_item(item)
 
     def write(self, board: Board):
         if not board.doc:
@@ -59,18 +100,7 @@ class ReadmeWriter(ReadmeParts):
         if board.doc.params.voltage:
             rows.append(["Voltage", board.doc.params.voltage])
         if board.pcb and board.pcb.pinout:
-            role_pins: dict[RoleType, set] = {}
-            for pin in board.pcb.pinout.values():
-                for role_type, roles in pin.items():
-                    if role_type not in role_pins:
-                        role_pins[role_type] = set()
-                    if not isinstance(roles, list):
-                        roles = [str(roles)]
-                    for role in roles:
-                        if role[0].isnumeric() and len(role) > 2 and role[1] == "_":
-                            role_pins[role_type].add(role[0])
-                        else:
-                            role_pins[role_type].add(role)
+            role_pins = self.core.get_pin_index(board.pcb).role_pins
             roles = [RoleType.GPIO, RoleType.PWM, RoleType.UART, RoleType.ADC]
             counts = [
                 f"{len(role_pins[r])}x {r.name}"
@@ -103,19 +133,7 @@ class ReadmeWriter(ReadmeParts):
             ]
             self.add_code(code, lang="ini")
 
-            component = None
-            # noinspection PyBroadException
-            try:
-                from ltchiptool import Family
-
-                family = Family.get(board.build.family)
-                for f in family.inheritance:
-                    if f.name in family_component_map:
-                        component = family_component_map[f.name]
-                        break
-            except Exception:
-                pass
-
+            component = self.get_component(board.build.family, family_component_map)
             if component:
                 self.add_text("In ESPHome YAML:")
                 code = [
@@ -136,16 +154,15 @@ class ReadmeWriter(ReadmeParts):
             gpio_pins: dict[str, dict[RoleType, list[str]]] = {}
             roles = self.core.roles
             hidden = board.pcb.pinout_hidden.split(",")
+            index = self.core.get_pin_index(board.pcb)
 
-            for pin in board.pcb.pinout.values():
-                if RoleType.GPIO not in pin:
-                    continue
-                gpio = pin[RoleType.GPIO]
+            for gpio, pin in index.gpio_pins.items():
                 gpio_pins[gpio] = {}
                 for role_type, functions in pin.items():
                     if role_type not in roles:
                         continue
-                    role_text = roles[role_type].format(
+                    role_text = index.format(
+                        role_type,
                         functions,
                         long=False,
                         hidden=hidden,
@@ -174,39 +191,72 @@ class ReadmeWriter(ReadmeParts):
 
         # Flash
         if board.flash:
-            self.add_heading("Flash memory map", 2)
-            self.add_text(
-                "Flash size:",
-                board.size_flash,
-                "/",
-                f"{format(board.upload.flash_size, ',d')} B",
-                "/",
-                "0x%X" % board.upload.flash_size,
-            )
-            self.add_text("Hex values are in bytes.")
-            names = self.core.flash
             flash = sorted(board.flash, key=lambda reg: reg.start)
-            header = ["Name", "Start", "Length", "End"]
-            rows = []
-            prev_end = 0
             for reg in flash:
                 reg.hex_size_len = 0
-                name = names[reg.name] if reg.name in names else reg.name
-                if prev_end < reg.start:
-                    res = FlashRegion(
-                        name="res",
-                        offset=prev_end,
-                        length=reg.start - prev_end,
-                    )
-                    res.hex_offs_len = reg.hex_offs_len
-                    rows.append(["(reserved)"] + res.lst)
-                rows.append([name] + reg.lst)
-                prev_end = reg.end
-            self.add_table(header, *rows)
+            inputs = [
+                "flash",
+                board.size_flash,
+                board.upload.flash_size,
+                [(r.name, r.offset, r.length, r.hex_offs_len) for r in flash],
+                self.core.flash,
+            ]
+            self.add_cached(inputs, lambda: self.add_flash(board, flash))
 
         # Extras
         if board.doc.extra:
-            self.items += board.doc.extra
+            for item in board.doc.extra:
+                self.add_item(item)
+
+    def add_flash(self, board: Board, flash: list[FlashRegion]):
+        self.add_heading("Flash memory map", 2)
+        self.add_text(
+            "Flash size:",
+            board.size_flash,
+            "/",
+            f"{format(board.upload.flash_size, ',d')} B",
+            "/",
+            "0x%X" % board.upload.flash_size,
+        )
+        self.add_text("Hex values are in bytes.")
+        names = self.core.flash
+        header = ["Name", "Start", "Length", "End"]
+        rows = []
+        prev_end = 0
+        for reg in flash:
+            name = names[reg.name] if reg.name in names else reg.name
+            if prev_end < reg.start:
+                res = FlashRegion(
+                    name="res",
+                    offset=prev_end,
+                    length=reg.start - prev_end,
+                )
+                res.hex_offs_len = reg.hex_offs_len
+                rows.append(["(reserved)"] + res.lst)
+            rows.append([name] + reg.lst)
+            prev_end = reg.end
+        self.add_table(header, *rows)
+
+    def get_component(self, family: str, component_map: dict[str, str]) -> str | None:
+        # ESPHome component of a family - ltchiptool lookup, memoized
+        key = hash_content(json.dumps(["component", family, component_map]))
+        cache = self.core._cache["readme"]
+        if key in cache:
+            return cache[key]
+        component = None
+        # noinspection PyBroadException
+        try:
+            from ltchiptool import Family
+
+            family = Family.get(family)
+            for f in family.inheritance:
+                if f.name in component_map:
+                    component = component_map[f.name]
+                    break
+        except Exception:
+            pass
+        cache[key] = component
+        return component
 
     def to_string(self) -> str:
         return "\n\n".join(self.items)
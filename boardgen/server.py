@@ -0,0 +1,215 @@
+#  Copyright (c) Kuba Szczodrzyński 2026-10-19.
+
+import json
+import os
+import socketserver
+from base64 import b64encode
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from threading import Lock, Thread
+from typing import Callable
+
+from .core import Core
+from .vector import V
+from .watch import FileWatcher, get_json_keys
+
+WATCH_TYPES = ["boards", "shapes", "templates"]
+
+
+class RenderServer:
+    """Answer JSON requests using a long-running, warm Core.
+
+    Requests are objects with a "cmd" key:
+
+    - {"cmd": "ping"} - return the boardgen version
+    - {"cmd": "list", "type": "boards"} - list boards/shapes/templates
+    - {"cmd": "validate", "board": "..."} - build the board, report errors
+    - {"cmd": "render", "board": "...", "outputs": [...]} - return outputs,
+      as in Core.render() ("size", "scale", "with_canvas" and "with_labels"
+      are optional); binary outputs are base64-encoded and listed
+      in "base64"
+
+    Responses are {"ok": true, "result": ...} or {"ok": false, "error": "..."}.
+
+    Connections are handled in separate threads, but Core (and its cache)
+    is only used by one request at a time. LibreTiny families.json is read
+    from the CWD, so the server has to be started in the LibreTiny root
+    for family changes to be picked up.
+    """
+
+    core: Core
+    res_files: list[str]
+    reload: Callable[[], None] | None
+
+    def __init__(
+        self,
+        core: Core,
+        res_files: list[str],
+        reload: Callable[[], None] = None,
+    ) -> None:
+        self.core = core
+        self.res_files = [os.path.abspath(f) for f in res_files]
+        self.reload = reload
+        # one lock for the whole request, on purpose: Core's cache and
+        # the built shapes are not thread-safe, so requests are rendered
+        # one at a time; threads only keep slow clients from blocking others
+        self.lock = Lock()
+        self.servers: list[socketserver.BaseServer] = []
+        self._watcher: FileWatcher | None = None
+
+    def handle(self, request: dict) -> dict:
+        try:
+            if not isinstance(request, dict):
+                raise ValueError("Request must be a JSON object")
+            cmd = request.get("cmd", None)
+            func = getattr(self, f"cmd_{cmd}", None)
+            if not cmd or not func:
+                raise ValueError(f"Unknown command '{cmd}'")
+            with self.lock:
+                result = func(request)
+            return dict(ok=True, result=result)
+        except Exception as e:
+            return dict(ok=False, error=f"{type(e).__name__}: {e}")
+
+    def cmd_ping(self, _: dict) -> dict:
+        return dict(version=self.core.version)
+
+    def cmd_list(self, request: dict) -> list[str]:
+        type = request.get("type", "boards")
+        if type not in WATCH_TYPES:
+            raise ValueError(f"Unknown type '{type}'")
+        return sorted(self.core.list_json(type))
+
+    def _get_board_name(self, request: dict) -> str:
+        name = request.get("board", None)
+        if name not in self.core.list_json("boards"):
+            raise ValueError(f"Board '{name}' not found")
+        return name
+
+    def cmd_validate(self, request: dict) -> dict:
+        board = self.core.get_board(self._get_board_name(request))
+        return dict(id=board.id, name=board.name)
+
+    def cmd_render(self, request: dict) -> dict:
+        size = request.get("size", None)
+        outputs = self.core.render(
+            self._get_board_name(request),
+            outputs=request.get("outputs", None),
+            px_size=V(*size) if size else V(1024, 500),
+            scale=request.get("scale", None),
+            with_canvas=request.get("with_canvas", True),
+            with_labels=request.get("with_labels", True),
+        )
+        binary = [name for name, value in outputs.items() if isinstance(value, bytes)]
+        for name in binary:
+            outputs[name] = b64encode(outputs[name]).decode()
+        return dict(outputs=outputs, base64=binary)
+
+    def invalidate(self, changed: set[str]) -> None:
+        """Drop cached data of the changed files."""
+        with self.lock:
+            if changed & set(self.res_files):
+                # presets/roles/flash are used by all boards
+                self.core.clear_cache()
+                if self.reload:
+                    self.reload()
+                return
+            for path in changed:
+                for key in get_json_keys(self.core, path, WATCH_TYPES):
+                    self.core.remove_from_cache(*key)
+            # built boards may include any of the changed files
+            self.core._cache["board_objs"].clear()
+
+    def watch(self, interval: float = 0.5) -> FileWatcher:
+        """Start invalidating the cache in a background thread."""
+        dirs = set(dir for type in WATCH_TYPES for dir in self.core.get_dirs(type))
+        self._watcher = FileWatcher(sorted(dirs), self.res_files, interval)
+
+        def run() -> None:
+            while self._watcher:
+                try:
+                    changed = self._watcher.wait()
+                except (OSError, ValueError):
+                    # watcher closed
+                    return
+                self.invalidate(changed)
+
+        Thread(target=run, daemon=True).start()
+        return self._watcher
+
+    def listen_unix(self, path: str) -> socketserver.BaseServer:
+        """Serve JSON lines (one request/response per line) on a Unix socket."""
+        if not hasattr(socketserver, "ThreadingUnixStreamServer"):
+            raise RuntimeError("Unix sockets are not supported on this platform")
+        server = self
+
+        class Handler(socketserver.StreamRequestHandler):
+            def handle(self) -> None:
+                for line in self.rfile:
+                    if not line.strip():
+                        continue
+                    try:
+                        request = json.loads(line)
+                    except ValueError as e:
+                        response = dict(ok=False, error=f"Invalid JSON: {e}")
+                    else:
+                        response = server.handle(request)
+                    self.wfile.write(json.dumps(response).encode() + b"\n")
+                    self.wfile.flush()
+
+        if os.path.exists(path):
+            os.unlink(path)
+        unix = socketserver.ThreadingUnixStreamServer(path, Handler)
+        unix.daemon_threads = True
+        self.servers.append(unix)
+        return unix
+
+    def listen_http(self, host: str, port: int) -> socketserver.BaseServer:
+        """Serve requests POSTed as JSON over HTTP."""
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_POST(self) -> None:
+                length = int(self.headers.get("Content-Length", 0))
+                try:
+                    request = json.loads(self.rfile.read(length))
+                except ValueError as e:
+                    response = dict(ok=False, error=f"Invalid JSON: {e}")
+                else:
+                    response = server.handle(request)
+                data = json.dumps(response).encode()
+                self.send_response(200 if response["ok"] else 400)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+            def log_message(self, *_) -> None:
+                pass
+
+        http = ThreadingHTTPServer((host, port), Handler)
+        self.servers.append(http)
+        return http
+
+    def serve_forever(self) -> None:
+        threads = [Thread(target=s.serve_forever, daemon=True) for s in self.servers]
+        for thread in threads:
+            thread.start()
+        try:
+            for thread in threads:
+                thread.join()
+        finally:
+            self.close()
+
+    def close(self) -> None:
+        for server in self.servers:
+            server.shutdown()
+            server.server_close()
+            if isinstance(server.server_address, str):
+                try:
+                    os.unlink(server.server_address)
+                except OSError:
+                    pass
+        self.servers = []
+        if self._watcher:
+            watcher, self._watcher = self._watcher, None
+            watcher.close()
@@ -4,6 +4,7 @@ from .base import LabelShape, Shape
 from .circle import Circle
 from .fill_style import FillStyle
 from .group import ShapeGroup
+from .layers import SvgLayers
 from .rect import Rect
 from .text import Text
 
@@ -15,4 +16,5 @@ __all__ = [
     "Rect",
     "Text",
     "LabelShape",
+    "SvgLayers",
 ]
@@ -11,6 +11,7 @@ from ..mixins import HasId, HasVars
 from ..models.enums import LabelDir, RoleType, ShapeType
 from ..utils import EvalFloat, Model, splitxy, var
 from ..vector import V
+from .layers import SvgLayers
 
 
 def remap(shape: dict):
@@ -36,6 +37,10 @@ class Shape(Model, HasId):
     def draw(self, dwg: Drawing, unit: float = 1.0):
         raise NotImplementedError()
 
+    def draw_layered(self, layers: SvgLayers, unit: float = 1.0):
+        name = "pads" if self.fullid in layers.pads else "pcb"
+        self.draw(layers.layer(name), unit)
+
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
         self.__post_init__()
@@ -157,6 +162,13 @@ class LabelShape(Shape):
         if self.label_size:
             self.padding *= self.label_size
 
+    @property
+    def layer_name(self) -> str:
+        return f"labels-{self.role_type.value.lower()}"
+
+    def draw_layered(self, layers: SvgLayers, unit: float = 1.0):
+        self.draw(layers.layer(self.layer_name), unit)
+
     @property
     def dirv(self):
         return -1 if self.label_dir == LabelDir.LEFT else 1
@@ -27,18 +27,17 @@ class FillStyle(Model):
         if self.color:
             color = self.color.as_hex()
         elif self.lgrad:
-            units = max(*self.lgrad[0].tuple, *self.lgrad[2].tuple)
+            start, end = self.lgrad[0], self.lgrad[2]
+            units = max(*start.tuple, *end.tuple)
             if units <= 1:
+                # relative stops - map onto the shape's bounding box
                 pos1 = shape.pos1
                 size = shape.size
-                for i in [0, 2]:
-                    self.lgrad[i].x *= size.x
-                    self.lgrad[i].y *= size.y
-                    self.lgrad[i].x += pos1.x
-                    self.lgrad[i].y += pos1.y
+                start = start * size + pos1
+                end = end * size + pos1
             grad = LinearGradient(
-                start=(self.lgrad[0] * unit).tuple,
-                end=(self.lgrad[2] * unit).tuple,
+                start=(start * unit).tuple,
+                end=(end * unit).tuple,
                 gradientUnits="userSpaceOnUse",
             )
             grad.add_stop_color(offset="0%", color=self.lgrad[1])
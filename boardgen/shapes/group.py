@@ -5,6 +5,7 @@ from svgwrite import Drawing
 from ..mixins import HasVars, ParentType
 from ..vector import V
 from .base import Shape
+from .layers import SvgLayers
 
 
 class ShapeGroup(Shape, HasVars):
@@ -37,6 +38,13 @@ class ShapeGroup(Shape, HasVars):
         for shape in self.shapes:
             shape.draw(dwg, unit)
 
+    def draw_layered(self, layers: SvgLayers, unit: float = 1.0):
+        if self.fullid in layers.pads:
+            self.draw(layers.layer("pads"), unit)
+            return
+        for shape in self.shapes:
+            shape.draw_layered(layers, unit)
+
     def get_by_id(self, id: str) -> Shape | None:
         for shape in self.shapes:
             if shape.fullid == id:
@@ -3,13 +3,14 @@
 from math import radians, tan
 
 from svgwrite import Drawing
-from svgwrite.container import Group
+from svgwrite.container import Group, Use
 from svgwrite.shapes import Rect
 from svgwrite.text import Text
 
 from ...utils import EvalFloat
 from ...vector import V
 from ..base import LabelShape
+from ..layers import SvgLayers
 
 
 class Block(LabelShape):
@@ -18,8 +19,11 @@ class Block(LabelShape):
     radius: EvalFloat = 0.3
     angle: EvalFloat = 15
 
-    def draw(self, dwg: Drawing, unit: float = 1.0):
-        g = Group()
+    @property
+    def skew_len(self) -> float:
+        return self.height * tan(radians(self.angle))
+
+    def build_background(self, unit: float = 1.0) -> Rect:
         bg = Rect(
             insert=(0, 0),
             size=(self.size * unit).tuple,
@@ -28,28 +32,60 @@ class Block(LabelShape):
         )
         bg.fill(color=self.color.as_hex())
         bg.skewX(-self.angle)
-        skew_len = self.height * tan(radians(self.angle))
-        g.add(bg)
-        g.translate((self.x1 + skew_len / 2) * unit, self.y1 * unit)
+        return bg
+
+    def draw(self, dwg: Drawing, unit: float = 1.0):
+        self.draw_background(dwg, unit)
+        self.draw_text(dwg, unit)
+
+    def draw_background(self, dwg: Drawing, unit: float = 1.0):
+        g = Group()
+        g.add(self.build_background(unit))
+        g.translate((self.x1 + self.skew_len / 2) * unit, self.y1 * unit)
         dwg.add(g)
 
+    def draw_layered(self, layers: SvgLayers, unit: float = 1.0):
+        layer = layers.layer(self.layer_name)
+        # blocks of the same role and size share a single background symbol
+        key = (
+            self.role_type,
+            self.ratio,
+            self.size.tuple,
+            self.color.as_hex(),
+            self.radius,
+            self.angle,
+            unit,
+        )
+        symbol_id = layers.symbol(
+            key,
+            lambda symbol: symbol.add(self.build_background(unit)),
+        )
+        bg = Use(
+            href=f"#{symbol_id}",
+            insert=((self.x1 + self.skew_len / 2) * unit, self.y1 * unit),
+        )
+        layer.add(bg)
+        self.draw_text(layer, unit)
+
+    def draw_text(self, dwg: Drawing, unit: float = 1.0, negation: bool = True):
         text = self.text
         text_pos = self.center
         text_color = "#423F42" if self.color.as_hsl_tuple()[2] > 0.5 else "white"
 
         if text.startswith("^"):
             text = text[1:]
-            negation_line = Text(
-                text="___",
-                insert=(text_pos.x * unit, (self.y1 - self.width / 16) * unit),
-                font_family="Consolas",
-                font_size=self.label_size * 0.6 * unit,
-                text_anchor="middle",
-                dominant_baseline="middle",
-            )
-            negation_line.fill(color=text_color)
-            dwg.add(negation_line)
-            text_pos.y += self.width / 32
+            if negation:
+                negation_line = Text(
+                    text="___",
+                    insert=(text_pos.x * unit, (self.y1 - self.width / 16) * unit),
+                    font_family="Consolas",
+                    font_size=self.label_size * 0.6 * unit,
+                    text_anchor="middle",
+                    dominant_baseline="middle",
+                )
+                negation_line.fill(color=text_color)
+                dwg.add(negation_line)
+                text_pos.y += self.width / 32
 
         txt = Text(
             text=text,
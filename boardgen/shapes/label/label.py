@@ -7,6 +7,7 @@ from ...models.role import Role
 from ...shapes.base import Shape
 from ...vector import V
 from ..base import LabelShape
+from ..layers import SvgLayers
 from .block import Block
 from .io_line import IOLine
 
@@ -23,6 +24,7 @@ class Label(LabelShape):
         hidden: list[str],
         block_extra: dict = {},
         io_extra: dict = {},
+        index=None,
     ):
         # not connected pin
         if RoleType.NC in self.roles:
@@ -53,7 +55,11 @@ class Label(LabelShape):
             if role_type not in core.roles:
                 continue
             role: Role = core.roles[role_type]
-            texts = role.format(functions, hidden=hidden)
+            if index:
+                # PinIndex - reuse texts formatted for other pins/sides
+                texts = index.format(role_type, functions, hidden=hidden)
+            else:
+                texts = role.format(functions, hidden=hidden)
             for text in texts:
                 params = dict(
                     pos=V(pos),
@@ -88,6 +94,10 @@ class Label(LabelShape):
         for shape in self.labels:
             shape.draw(dwg, unit)
 
+    def draw_layered(self, layers: SvgLayers, unit: float = 1.0):
+        for shape in self.labels:
+            shape.draw_layered(layers, unit)
+
     @property
     def x1(self) -> float:
         return min(self.labels, key=lambda t: t.x1).x1
@@ -0,0 +1,37 @@
+#  Copyright (c) Kuba Szczodrzyński 2026-10-19.
+
+from typing import Callable, Hashable
+
+from svgwrite import Drawing
+from svgwrite.container import Group, Symbol
+
+
+class SvgLayers:
+    """Named layer groups and shared symbols of a layered Drawing."""
+
+    dwg: Drawing
+    pads: set[str]
+    layers: dict[str, Group]
+    symbols: dict[Hashable, str]
+
+    def __init__(self, dwg: Drawing, pads: set[str] = None) -> None:
+        self.dwg = dwg
+        self.pads = pads or set()
+        self.layers = {}
+        self.symbols = {}
+
+    def layer(self, name: str) -> Group:
+        if name not in self.layers:
+            group = Group(id=f"layer-{name}", class_="layer")
+            self.dwg.add(group)
+            self.layers[name] = group
+        return self.layers[name]
+
+    def symbol(self, key: Hashable, build: Callable[[Symbol], None]) -> str:
+        if key not in self.symbols:
+            symbol_id = f"symbol-{len(self.symbols) + 1}"
+            symbol = Symbol(id=symbol_id, overflow="visible")
+            build(symbol)
+            self.dwg.defs.add(symbol)
+            self.symbols[key] = symbol_id
+        return self.symbols[key]
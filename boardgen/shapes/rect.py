@@ -17,21 +17,27 @@ class Rect(Shape):
     stroke: FillStyle = None
 
     def draw(self, dwg: Drawing, unit: float = 1.0):
+        pos, size_v = self.pos, self.size_v
         if self.stroke and self.stroke.width:
-            self.pos += (self.stroke.width / 2, self.stroke.width / 2)
-            self.size_v -= (self.stroke.width, self.stroke.width)
-        rect = shapes.Rect(
-            insert=(self.pos * unit).tuple,
-            size=(self.size_v * unit).tuple,
-            rx=(self.rx or 0) * unit,
-            ry=(self.ry or 0) * unit,
-            id=self.fullid,
-        )
-        if self.fill:
-            self.fill.apply_to(dwg, rect, self, unit)
-        if self.stroke:
-            self.stroke.apply_to(dwg, rect, self, unit, stroke=True)
-        dwg.add(rect)
+            # inset by half the stroke width; restored after drawing,
+            # so that the same shape can be drawn more than once
+            self.pos = pos + (self.stroke.width / 2, self.stroke.width / 2)
+            self.size_v = size_v - (self.stroke.width, self.stroke.width)
+        try:
+            rect = shapes.Rect(
+                insert=(self.pos * unit).tuple,
+                size=(self.size_v * unit).tuple,
+                rx=(self.rx or 0) * unit,
+                ry=(self.ry or 0) * unit,
+                id=self.fullid,
+            )
+            if self.fill:
+                self.fill.apply_to(dwg, rect, self, unit)
+            if self.stroke:
+                self.stroke.apply_to(dwg, rect, self, unit, stroke=True)
+            dwg.add(rect)
+        finally:
+            self.pos, self.size_v = pos, size_v
 
     @property
     def x2(self) -> float:
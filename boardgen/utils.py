@@ -3,17 +3,26 @@
 import json
 import re
 
-from pydantic import BaseModel
-
 from .vector import V
 
 if_re = r"<([^:>]+?):([^:>]+?):([^:>]+?):([^:>]+?)>"
 eval_re = r"<([^>]+?)>"
 
 
-class Model(BaseModel):
-    class Config:
-        arbitrary_types_allowed = True
+def __getattr__(name: str):
+    # import pydantic only when a model is actually defined
+    if name != "Model":
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    from pydantic import BaseModel
+
+    class Model(BaseModel):
+        class Config:
+            arbitrary_types_allowed = True
+
+    Model.__module__ = __name__
+    Model.__qualname__ = "Model"
+    globals()["Model"] = Model
+    return Model
 
 
 class EvalFloat(float):
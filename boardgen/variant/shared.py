@@ -0,0 +1,132 @@
+#  Copyright (c) Kuba Szczodrzyński 2026-10-19.
+
+from glob import glob
+from os.path import basename, join
+
+from ..models.board import Board
+from .writer import VariantWriter, format_c, format_h
+
+
+class SharedVariants:
+    """Variant files of multiple boards, with the content which is identical
+    for boards of the same family moved to family-level headers.
+
+    Per-board variant files then only include the shared headers.
+    """
+
+    # { board_id: (family, sections, pins) }
+    boards: dict[str, tuple[str, str, str | None]]
+
+    def __init__(self) -> None:
+        self.boards = {}
+
+    def add(self, board: Board, writer: VariantWriter) -> None:
+        family = board.build.family.lower()
+        pins = writer.format_pins() if writer.pins else None
+        self.boards[board.id] = (family, writer.format_sections(), pins)
+
+    @property
+    def families(self) -> set[str]:
+        return {family for family, _, _ in self.boards.values()}
+
+    @staticmethod
+    def get_name(family: str, kind: str, number: int) -> str:
+        # stable names - content changes don't leave orphaned files behind
+        if number == 1:
+            return f"{family}_{kind}.h"
+        return f"{family}_{kind}_{number}.h"
+
+    def get_stale_headers(self, output: str, headers: dict[str, str]) -> list[str]:
+        """Find shared header files of this set's families in a directory,
+        which are no longer generated nor included by any variant file
+        (i.e. of boards not in this set).
+
+        Args:
+            output (str): Output directory (with the per-board files saved).
+            headers (dict[str, str]): Generated shared headers.
+        """
+        variants = []
+        for pattern in ["*.h", "*.c", "*/variant.h", "*/variant.c"]:
+            for path in glob(join(output, pattern)):
+                with open(path, "r", encoding="utf-8") as f:
+                    variants.append(f.read())
+        paths = []
+        for family in sorted(self.families):
+            for kind in ["sections", "pins"]:
+                for path in sorted(glob(join(output, f"{family}_{kind}*.h"))):
+                    name = basename(path)
+                    suffix = name[len(f"{family}_{kind}") : -2]
+                    if suffix and not (suffix[0] == "_" and suffix[1:].isnumeric()):
+                        continue
+                    if name in headers:
+                        continue
+                    if any(f'"{name}"' in text for text in variants):
+                        continue
+                    paths.append(path)
+        return paths
+
+    def generate(
+        self,
+        prefix: str = "",
+    ) -> tuple[dict[str, str], dict[str, dict[str, str]]]:
+        """Generate the shared headers and per-board variant files.
+
+        Content is only shared if two or more boards of a family produce it.
+
+        Args:
+            prefix (str, optional): Path of the shared headers' directory,
+                relative to the per-board files (for #include).
+
+        Returns:
+            tuple: Shared headers ({ file_name: content }) and per-board
+                outputs ({ board_id: { "variant_h": ..., "variant_c": ... } }).
+        """
+        # { (family, kind, content): [board_id, ...] }
+        users: dict[tuple[str, str, str], list[str]] = {}
+        for board_id, (family, sections, pins) in sorted(self.boards.items()):
+            users.setdefault((family, "sections", sections), []).append(board_id)
+            if pins:
+                users.setdefault((family, "pins", pins), []).append(board_id)
+
+        # { (family, kind, content): file_name } - of groups with 2+ boards,
+        # numbered in the order of their first boards (dicts keep the order)
+        names: dict[tuple[str, str, str], str] = {}
+        numbers: dict[tuple[str, str], int] = {}
+        for (family, kind, content), board_ids in users.items():
+            if len(board_ids) < 2:
+                continue
+            numbers[family, kind] = numbers.get((family, kind), 0) + 1
+            names[family, kind, content] = self.get_name(
+                family, kind, numbers[family, kind]
+            )
+
+        shared = {}
+        outputs = {}
+        for board_id, (family, sections, pins) in self.boards.items():
+            board_name = f"{board_id}.json"
+            include_h = include_c = None
+
+            if name := names.get((family, "sections", sections), None):
+                shared[name] = self.format_shared(
+                    users[family, "sections", sections], "#pragma once", "", sections
+                )
+                include_h = prefix + name
+            if pins and (name := names.get((family, "pins", pins), None)):
+                shared[name] = self.format_shared(users[family, "pins", pins], pins, "")
+                include_c = prefix + name
+
+            outputs[board_id] = {"variant_h": format_h(board_name, sections, include_h)}
+            if pins:
+                outputs[board_id]["variant_c"] = format_c(board_name, pins, include_c)
+        return shared, outputs
+
+    @staticmethod
+    def format_shared(board_ids: list[str], *lines: str) -> str:
+        board_names = ", ".join(f"{board_id}.json" for board_id in board_ids)
+        return "\n".join(
+            [
+                f"/* This file was auto-generated from {board_names} using boardgen */",
+                "",
+                *lines,
+            ]
+        )
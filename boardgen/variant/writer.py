@@ -1,13 +1,13 @@
 # Copyright (c) Kuba Szczodrzyński 2022-06-15.
 
 import os
-import re
 from os.path import dirname
 
 from ..core import Core
 from ..models.board import Board
 from ..models.enums import RoleType
 from ..models.pcb import PinDict
+from ..pin_index import PinIndex
 from .features import PinFeatures
 from .parts import VariantParts
 from .section import SectionType
@@ -51,6 +51,39 @@ MACROS_ROLES = list(PORT_SIGNALS.keys()) + [
 ROLES_HIDDEN = ["ARD_A", "ARD_D", "IO", "C_NAME", "PHYSICAL"]
 
 
+def format_h(board_name: str, sections: str, include: str = None) -> str:
+    """Format a variant header, with the sections or an #include
+    of a shared header.
+    """
+    lines = [
+        f"/* This file was auto-generated from {board_name} using boardgen */",
+        "",
+        "#pragma once",
+        "",
+        f'#include "{include}"\n' if include else sections,
+    ]
+    return "\n".join(lines)
+
+
+def format_c(board_name: str, pins: str, include: str = None) -> str:
+    """Format a variant source file, with the pins or an #include
+    of a shared file.
+    """
+    lines = [
+        f"/* This file was auto-generated from {board_name} using boardgen */",
+        "",
+        "#include <Arduino.h>",
+        "",
+        "#ifdef LT_VARIANT_INCLUDE",
+        "#include LT_VARIANT_INCLUDE",
+        "#endif",
+        "",
+        f'#include "{include}"' if include else pins,
+        "",
+    ]
+    return "\n".join(lines)
+
+
 class VariantWriter(VariantParts):
     core: Core
 
@@ -63,15 +96,7 @@ class VariantWriter(VariantParts):
 
     @staticmethod
     def read_pin(pin: PinDict) -> tuple[str, str, int] | None:
-        name = pin.get(RoleType.GPIO, None) or pin.get(RoleType.ADC, None)
-        c_name = pin.get(RoleType.C_NAME, name)
-        if not name:
-            return None
-        number = pin.get(RoleType.GPIONUM, None)
-        if number is not None:
-            return name, c_name, int(number)
-        number = re.sub(r"\D", "", name)
-        return name, c_name, int(number)
+        return PinIndex.read_pin(pin)
 
     def generate(self, board: Board):
         pcb = board.pcb
@@ -85,30 +110,23 @@ class VariantWriter(VariantParts):
         self.add_item(SectionType.PINS, "NUM_ANALOG_INPUTS", 0, "ADC inputs")
         self.add_item(SectionType.PINS, "NUM_ANALOG_OUTPUTS", 0, "PWM & DAC outputs")
 
-        # { role_type: { index: { signal: [...pin_numbers] } } }
-        ports: dict[RoleType, dict[int, dict[str, list[int]]]] = {}
-        for role_type in PORT_SIGNALS.keys():
-            ports[role_type] = {}
+        index = self.core.get_pin_index(pcb)
         max_pin_number = 0
 
-        for pin in pcb.pinout.values():
-            pin_tuple = self.read_pin(pin)
-            if not pin_tuple:
-                continue
+        for pin_id, pin_tuple in index.numbers.items():
+            pin = index.pins[pin_id]
             pin_name, c_name, pin_number = pin_tuple
 
-            arduino_name = None
             ard_d = pin.get(RoleType.ARD_D, None)
             ard_a = pin.get(RoleType.ARD_A, None)
             if ard_d:
                 self.add_item(SectionType.ARDUINO, f"PIN_{ard_d}", pin_number, c_name)
                 self.static_pins[ard_d] = f"PIN_{ard_d}"
-                arduino_name = ard_d
             if ard_a:
                 self.add_item(SectionType.ARDUINO, f"PIN_{ard_a}", pin_number, c_name)
                 self.static_pins[ard_a] = f"PIN_{ard_a}"
-                arduino_name = arduino_name or ard_a
 
+            arduino_name = index.arduino_names.get(pin_id, None)
             if not arduino_name:
                 continue
             self.gpio_map[pin_number] = arduino_name
@@ -118,14 +136,13 @@ class VariantWriter(VariantParts):
             for role_type, values in pin.items():
                 if role_type.name in ROLES_HIDDEN:
                     continue
-                role = self.core.role(role_type)
-                if not role:
-                    continue
-                pin_comment += role.format(values, long=True, hidden=ROLES_HIDDEN)
+                pin_comment += index.format(
+                    role_type, values, long=True, hidden=ROLES_HIDDEN
+                )
                 if role_type not in MACROS_ROLES:
                     continue
-                roles_short = role.format(
-                    values, long=False, hidden=ROLES_HIDDEN, safe=True
+                roles_short = index.format(
+                    role_type, values, long=False, hidden=ROLES_HIDDEN, safe=True
                 )
                 for text in roles_short:
                     self.add_item(
@@ -155,30 +172,10 @@ class VariantWriter(VariantParts):
                     continue
                 self.add_pin_feature(arduino_name, FEATURE_MAP[role_type])
 
-            # find all indexed interfaces this pin belongs to
-            for role_type, roles in pin.items():
-                if role_type not in ports:
-                    continue
-                if not isinstance(roles, list):
-                    roles = [str(roles)]
-                for role in roles:
-                    # require "1_RX" format
-                    (index, _, port) = role.partition("_")
-                    if index and port and index.isnumeric():
-                        index = int(index)
-                    else:
-                        index = 0
-                        port = role
-                    if index not in ports[role_type]:
-                        ports[role_type][index] = {}
-                    if port not in ports[role_type][index]:
-                        ports[role_type][index][port] = []
-                    ports[role_type][index][port].append(pin_number)
-
         # { role_type: { index: { signal: [...pin_numbers] } } }
-        for role_type, interfaces in ports.items():
+        for role_type, interfaces in index.ports.items():
             section = SECTION_MAP[role_type]
-            for index, signals in interfaces.items():
+            for port_index, signals in interfaces.items():
                 if not all(s in signals for s in PORT_SIGNALS[role_type]):
                     # skip incomplete ports (i.e. only SDA1 available)
                     continue
@@ -187,8 +184,10 @@ class VariantWriter(VariantParts):
                     f"{section.name}_INTERFACES_COUNT",
                 )
                 for signal, pin_numbers in signals.items():
-                    self.add_item(SectionType.PORTS, f"HAS_{section.name}{index}", 1)
-                    key = f"PIN_{section.name}{index}_{signal}"
+                    self.add_item(
+                        SectionType.PORTS, f"HAS_{section.name}{port_index}", 1
+                    )
+                    key = f"PIN_{section.name}{port_index}_{signal}"
                     if len(pin_numbers) > 1:
                         for i, pin in enumerate(pin_numbers):
                             c_name = self.pins[self.gpio_map[pin]][0]
@@ -196,7 +195,7 @@ class VariantWriter(VariantParts):
                     else:
                         c_name = self.pins[self.gpio_map[pin_numbers[0]]][0]
                         self.add_item(section, key, pin_numbers[0], c_name)
-                    key = f"PINS_{section.name}{index}_{signal}"
+                    key = f"PINS_{section.name}{port_index}_{signal}"
                     pins_array = ", ".join(f"{pin}u" for pin in pin_numbers)
                     self.add_item(section, key, f"(pin_size_t[]){{{pins_array}}}")
 
@@ -207,31 +206,18 @@ class VariantWriter(VariantParts):
             "Last usable GPIO number",
         )
 
+    def format_h(self, board_name: str, include: str = None) -> str:
+        return format_h(board_name, self.format_sections(), include)
+
+    def format_c(self, board_name: str, include: str = None) -> str:
+        return format_c(board_name, self.format_pins(), include)
+
     def save_h(self, output: str, board_name: str):
         os.makedirs(dirname(output), exist_ok=True)
         with open(output, "w", encoding="utf-8") as f:
-            lines = [
-                f"/* This file was auto-generated from {board_name} using boardgen */",
-                "",
-                "#pragma once",
-                "",
-                self.format_sections(),
-            ]
-            f.write("\n".join(lines))
+            f.write(self.format_h(board_name))
 
     def save_c(self, output: str, board_name: str):
         os.makedirs(dirname(output), exist_ok=True)
         with open(output, "w", encoding="utf-8") as f:
-            lines = [
-                f"/* This file was auto-generated from {board_name} using boardgen */",
-                "",
-                "#include <Arduino.h>",
-                "",
-                "#ifdef LT_VARIANT_INCLUDE",
-                "#include LT_VARIANT_INCLUDE",
-                "#endif",
-                "",
-                self.format_pins(),
-                "",
-            ]
-            f.write("\n".join(lines))
+            f.write(self.format_c(board_name))
@@ -0,0 +1,142 @@
+#  Copyright (c) Kuba Szczodrzyński 2026-10-19.
+
+import os
+from glob import glob
+from os.path import abspath, dirname, isdir, join, relpath
+from time import sleep
+
+from .core import Core
+
+
+def get_json_keys(core: Core, path: str, types: list[str]) -> set[tuple[str, str]]:
+    """Find the (type, name) cache keys that a JSON file path may be loaded as."""
+    keys = set()
+    for type in types:
+        for dir in core.get_dirs(type):
+            name = relpath(abspath(path), abspath(dir)).replace("\\", "/")
+            if not name.startswith("../"):
+                keys.add((type, name.rpartition(".")[0]))
+    return keys
+
+
+class FileWatcher:
+    """Wait for changes of .json files in directories (recursively)
+    and of individual files.
+
+    Uses inotify (through the optional 'inotify_simple' package) when
+    available, otherwise falls back to polling file stats.
+    """
+
+    dirs: list[str]
+    files: list[str]
+    interval: float
+    _stats: dict[str, tuple[int, int]]
+
+    def __init__(
+        self,
+        dirs: list[str],
+        files: list[str],
+        interval: float = 0.5,
+    ) -> None:
+        self.dirs = [abspath(d) for d in dirs]
+        self.files = [abspath(f) for f in files]
+        self.interval = interval
+        self._stats = {}
+        self._inotify = None
+        self._watches: dict[int, str] = {}
+        try:
+            from inotify_simple import INotify, flags
+
+            self._inotify = INotify()
+            self._flags = (
+                flags.CLOSE_WRITE
+                | flags.CREATE
+                | flags.DELETE
+                | flags.MOVED_FROM
+                | flags.MOVED_TO
+            )
+            self._flag_isdir = flags.ISDIR
+            for path in self.dirs:
+                self._add_watch(path)
+            # watch parent directories, so that replaced files are noticed
+            for path in set(dirname(f) for f in self.files):
+                self._add_watch(path, recursive=False)
+        except (ImportError, OSError):
+            self._inotify = None
+            self._stats = self._scan()
+
+    @property
+    def is_inotify(self) -> bool:
+        return self._inotify is not None
+
+    def _add_watch(self, path: str, recursive: bool = True) -> None:
+        if not isdir(path):
+            return
+        roots = [root for root, _, _ in os.walk(path)] if recursive else [path]
+        for root in roots:
+            wd = self._inotify.add_watch(root, self._flags)
+            self._watches[wd] = root
+
+    def _is_watched(self, path: str) -> bool:
+        if path in self.files:
+            return True
+        if not path.endswith(".json"):
+            return False
+        return any(path.startswith(join(d, "")) for d in self.dirs)
+
+    def _scan(self) -> dict[str, tuple[int, int]]:
+        stats = {}
+        paths = list(self.files)
+        for dir in self.dirs:
+            paths += glob(join(dir, "**", "*.json"), recursive=True)
+        for path in paths:
+            try:
+                st = os.stat(path)
+            except OSError:
+                continue
+            stats[path] = (st.st_mtime_ns, st.st_size)
+        return stats
+
+    def wait(self) -> set[str]:
+        """Block until at least one file changes; return the changed paths."""
+        while True:
+            changed = self.poll()
+            if changed and self.is_inotify:
+                # collect the rest of a burst of events (i.e. editor saves)
+                while more := self.poll():
+                    changed |= more
+            if changed:
+                return changed
+            if not self.is_inotify:
+                sleep(self.interval)
+
+    def poll(self) -> set[str]:
+        if self.is_inotify:
+            changed = set()
+            timeout = self.interval * 1000
+            for event in self._inotify.read(timeout=timeout):
+                root = self._watches.get(event.wd, None)
+                if not root:
+                    continue
+                path = join(root, event.name) if event.name else root
+                if event.mask & self._flag_isdir:
+                    # watch newly created subdirectories too
+                    if self._is_watched(join(path, ".json")):
+                        self._add_watch(path)
+                    continue
+                if self._is_watched(path):
+                    changed.add(path)
+            return changed
+
+        stats = self._scan()
+        changed = {
+            path
+            for path in stats.keys() | self._stats.keys()
+            if stats.get(path, None) != self._stats.get(path, None)
+        }
+        self._stats = stats
+        return changed
+
+    def close(self) -> None:
+        if self._inotify:
+            self._inotify.close()
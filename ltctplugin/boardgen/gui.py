@@ -8,7 +8,6 @@ from os import makedirs, rename, unlink
 from os.path import abspath, basename, dirname, join
 from shutil import copyfile
 
-import markdown2
 import wx
 import wx.adv
 import wx.html
@@ -18,15 +17,17 @@ from ltchiptool.gui.panels.base import BasePanel
 from ltchiptool.gui.utils import on_event, with_event
 from ltchiptool.util.lvm import LVM
 
-from boardgen import Core, HasVars, ReadmeWriter, V, VariantWriter
-from boardgen.draw_util import draw_shapes, get_pcb_images
-from boardgen.models import Board, RoleType, Template
-from boardgen.shapes import Shape, ShapeGroup
+from boardgen import Core
+from boardgen.models import Board, RoleType
+from boardgen.shapes import Shape
 
+from .render import RenderJob, RenderThread, snapshot_cache
 from .svg import SvgPanel
-from .utils import jsonpath, jsonwalk
+from .utils import JsonPathIndex, jsonwalk
 from .work import LtciThread
 
+# delay before rebuilding the item after editing (ms)
+RENDER_DELAY = 300
 INIT_BOARD = {
     "_base": [],
     "build": {
@@ -143,6 +144,7 @@ class BoardgenPanel(BasePanel):
     edit_path: str = ""
     edit_errors: bool = False
     edit_type: EditType | None = None
+    path_index: JsonPathIndex | None = None
     modified: dict[str, dict] = None
     _vars: dict
 
@@ -165,6 +167,9 @@ class BoardgenPanel(BasePanel):
 
         self.AddToNotebook("boardgen")
 
+        self.Notebook: wx.Notebook = self.Left.FindWindowByName("m_notebook", self)
+        self.Notebook.Bind(wx.EVT_NOTEBOOK_PAGE_CHANGED, self.OnNotebookPage)
+
         self.PreviewPage: wx.NotebookPage = self.Left.FindWindowByName(
             "preview_page", self
         )
@@ -180,6 +185,12 @@ class BoardgenPanel(BasePanel):
         # self.Html.SetStandardFonts()
         self.ReadmeBox.Add(self.Html, proportion=1, flag=wx.EXPAND)
 
+        self.VariantHPage: wx.NotebookPage = self.Left.FindWindowByName(
+            "variant_h_page", self
+        )
+        self.VariantCPage: wx.NotebookPage = self.Left.FindWindowByName(
+            "variant_c_page", self
+        )
         self.VariantH = self.BindTextCtrl("text_variant_h")
         self.VariantC = self.BindTextCtrl("text_variant_c")
 
@@ -206,13 +217,20 @@ class BoardgenPanel(BasePanel):
         )
 
         self.lvm = LVM.get()
-        self.core = Core()
-        self.core.add_custom_dirs(
-            boards=join(self.lvm.path(), "boards"),
-            shapes=join(self.lvm.path(), "boards", "shapes"),
-            templates=join(self.lvm.path(), "boards", "templates"),
-        )
+        self.core = self.CreateCore()
         self.core.json_hook = self.AddEditItem
+        self.render_timer: wx.CallLater | None = None
+        self.renderer = RenderThread(
+            core=self.CreateCore(),
+            on_done=lambda job: wx.CallAfter(self.OnRenderDone, job),
+        )
+        self.renderer.start()
+        # bumped when the board changes in a way visible in README/variant
+        self.doc_key: str | None = None
+        self.doc_revision = 0
+        # doc_revision that each tab was last rendered at
+        self.tab_revisions = {"readme": -1, "variant": -1}
+        self.Bind(wx.EVT_WINDOW_DESTROY, self.OnDestroy)
 
         self.file_map = {}
         self.draw_items = {}
@@ -221,6 +239,23 @@ class BoardgenPanel(BasePanel):
 
         self.ReloadLists()
 
+    def CreateCore(self) -> Core:
+        core = Core()
+        core.add_custom_dirs(
+            boards=join(self.lvm.path(), "boards"),
+            shapes=join(self.lvm.path(), "boards", "shapes"),
+            templates=join(self.lvm.path(), "boards", "templates"),
+        )
+        return core
+
+    def OnDestroy(self, event: wx.WindowDestroyEvent) -> None:
+        event.Skip()
+        if event.GetEventObject() is not self:
+            return
+        if self.render_timer:
+            self.render_timer.Stop()
+        self.renderer.Stop()
+
     def GetSettings(self) -> dict:
         return dict(
             draw_item=self.draw_item,
@@ -277,12 +312,24 @@ class BoardgenPanel(BasePanel):
                 # debug(f"OnUpdate({target})")
                 pass
 
+    def ScheduleDrawItem(self, force_list: bool = True) -> None:
+        # rebuild after the user stops typing
+        self.renderer.Cancel()
+        if self.render_timer:
+            self.render_timer.Stop()
+        self.render_timer = wx.CallLater(RENDER_DELAY, self.UpdateDrawItem, force_list)
+
     def UpdateDrawItem(self, force_list: bool = True) -> None:
+        if self.render_timer:
+            self.render_timer.Stop()
+            self.render_timer = None
         item = self.draw_item
         if not item:
             return
         item_type, _, item_name = item.partition("/")
 
+        # keep the previous items until the build finishes
+        edit_items = self.edit_items
         self.edit_items = {}
         obj: dict = {}
         try:
@@ -294,51 +341,57 @@ class BoardgenPanel(BasePanel):
                 case "shapes":
                     obj = self.core.load_shape(item_name)
         except Exception as e:
+            self.renderer.Cancel()
             self.SetError(e)
             if force_list:
                 self.FillEditList()
             return
         self.vars = obj["vars"] if "vars" in obj else {}
-        parent = HasVars(vars=self.vars)
 
-        try:
-            match item_type:
-                case "boards":
-                    self.draw_object = self.core.get_board(item_name)
+        cache, presets = snapshot_cache(self.core)
+        tab = self.GetVisibleTab()
+        job = RenderJob(
+            generation=self.renderer.NextGeneration(),
+            item_type=item_type,
+            item_name=item_name,
+            vars=self.vars,
+            cache=cache,
+            presets=presets,
+            force_list=force_list,
+            edit_items=self.edit_items,
+            tab=tab,
+            tab_key=self.GetTabKey(tab),
+        )
+        self.edit_items = edit_items | job.edit_items
+        self.renderer.Submit(job)
 
-                case "templates":
-                    front: list[Shape] = []
-                    back: list[Shape] = []
-                    template = Template(**obj)
-                    for data in template.front:
-                        shape = self.core.build_shape(parent=parent, data=data)
-                        front.append(shape)
-                    for data in template.back:
-                        shape = self.core.build_shape(parent=parent, data=data)
-                        back.append(shape)
-                    if front and back:
-                        self.draw_object = [
-                            ShapeGroup.wrap(self.core, item_name, front),
-                            ShapeGroup.wrap(self.core, item_name, back),
-                        ]
-                    elif front:
-                        self.draw_object = ShapeGroup.wrap(self.core, item_name, front)
-                    elif back:
-                        self.draw_object = ShapeGroup.wrap(self.core, item_name, back)
+    def OnRenderDone(self, job: RenderJob) -> None:
+        # called on the UI thread - apply the results at once
+        if self.renderer.IsStale(job) or not self:
+            return
+        if job.item_type == "tab":
+            if job.error:
+                self.SetError(job.error)
+            self.ApplyTab(job)
+            # the tab might have been switched while this job was running
+            self.RequestTab()
+            return
+        self.edit_items = job.edit_items
+        for type, name in job.loaded:
+            # add edit items of files loaded by the build (from this Core)
+            if type == "res":
+                _ = self.core.presets
+            else:
+                self.core.load_json(type, name)
 
-                case "shapes":
-                    shapes: list[Shape] = []
-                    for data in obj:
-                        shape = self.core.build_shape(parent=parent, data=data)
-                        shapes.append(shape)
-                    self.draw_object = ShapeGroup.wrap(self.core, item_name, shapes)
-
-            self.Redraw()
-            self.SetError(None)
-        except Exception as e:
-            self.SetError(e)
-            if not force_list:
-                return
+        if job.error:
+            self.SetError(job.error)
+            if job.force_list:
+                self.FillEditList()
+            return
+        self.draw_object = job.draw_object
+        self.Redraw(job)
+        self.SetError(None)
         self.FillEditList()
 
     def FillEditList(self) -> None:
@@ -381,58 +434,76 @@ class BoardgenPanel(BasePanel):
             obj = obj["pcb"]
         self.vars = obj["vars"] if "vars" in obj else {}
 
-    def Redraw(self) -> None:
-        debug(f"Draw object: {self.draw_object}")
-        scale = 12
-        readme_html = ""
-        variant_h = ""
-        variant_c = ""
-
-        match self.draw_object:
-            case Board():
-                images = get_pcb_images(
-                    self.core,
-                    self.draw_object.pcb,
-                    with_labels=True,
-                )
-                if self.draw_object.pcb.scale is not None:
-                    scale = self.draw_object.pcb.scale
-
-                self.core.is_libretiny = True
-                readme = ReadmeWriter(self.core)
-                readme.write(board=self.draw_object)
-                readme_html = markdown2.markdown(
-                    text=readme.to_string(),
-                    extras=[
-                        "fenced-code-blocks",
-                        "tables",
-                    ],
-                )
-                readme_html = readme_html.replace("<table", "<table border=1")
-
-                writer = VariantWriter(self.core)
-                writer.generate(board=self.draw_object)
-                variant_h = writer.format_sections()
-                variant_c = writer.format_pins()
-
-            case list():
-                images = self.draw_object
-
-            case Shape():
-                images = [self.draw_object]
-
-            case _:
-                return
-
-        self.Html.SetPage(readme_html)
-        self.VariantH.ChangeValue(variant_h)
-        self.VariantC.ChangeValue(variant_c)
+    def Redraw(self, job: RenderJob) -> None:
+        if not isinstance(job.draw_object, (Board, list, Shape)):
+            return
+        if job.doc_key != self.doc_key:
+            self.doc_key = job.doc_key
+            self.doc_revision += 1
+        self.ApplyTab(job)
+        self.RequestTab()
 
-        if not images:
+        if not job.svg:
             self.Svg.ClearSvg()
             return
-        dwg = draw_shapes(V(1024, 500), scale, images, with_canvas=False)
-        self.Svg.LoadSvg(dwg)
+        self.Svg.LoadSvg(job.svg)
+
+    def GetVisibleTab(self) -> str | None:
+        page = self.Notebook.GetCurrentPage()
+        if page == self.ReadmePage:
+            return "readme"
+        if page in (self.VariantHPage, self.VariantCPage):
+            return "variant"
+        return None
+
+    def GetTabKey(self, tab: str | None) -> str | None:
+        # doc_key of the tab's content, None if outdated
+        if tab and self.tab_revisions[tab] == self.doc_revision:
+            return self.doc_key
+        return None
+
+    def RequestTab(self) -> None:
+        # render the README/variant only when shown, and only if outdated
+        tab = self.GetVisibleTab()
+        if not tab or self.tab_revisions[tab] == self.doc_revision:
+            return
+        if not isinstance(self.draw_object, Board):
+            self.tab_revisions[tab] = self.doc_revision
+            self.Html.SetPage("")
+            self.VariantH.ChangeValue("")
+            self.VariantC.ChangeValue("")
+            return
+        if self.render_timer or self.renderer.IsBusy():
+            # the next build renders the tab (or calls this again)
+            return
+        job = RenderJob(
+            # same generation - don't drop a build waiting for OnRenderDone
+            generation=self.renderer.generation,
+            item_type="tab",
+            item_name=tab,
+            vars={},
+            cache={},
+            presets={},
+            tab=tab,
+            draw_object=self.draw_object,
+            doc_key=self.doc_key,
+        )
+        self.renderer.Submit(job)
+
+    def ApplyTab(self, job: RenderJob) -> None:
+        if job.doc_key != self.doc_key:
+            return
+        if job.readme_html is not None:
+            self.Html.SetPage(job.readme_html)
+            self.tab_revisions["readme"] = self.doc_revision
+        if job.variant_h is not None:
+            self.VariantH.ChangeValue(job.variant_h)
+            self.VariantC.ChangeValue(job.variant_c)
+            self.tab_revisions["variant"] = self.doc_revision
+
+    def OnNotebookPage(self, event: wx.BookCtrlEvent) -> None:
+        event.Skip()
+        wx.CallAfter(self.RequestTab)
 
     @with_event
     def OnDataText(self, event: wx.Event) -> None:
@@ -445,14 +516,14 @@ class BoardgenPanel(BasePanel):
                 if self.edit_item:
                     self.MarkModified()
             self.edit_errors = False
-            self.UpdateDrawItem(force_list=self.edit_path.startswith("_base"))
+            self.ScheduleDrawItem(force_list=self.edit_path.startswith("_base"))
         except json.JSONDecodeError:
             self.edit_errors = True
 
     @with_event
     def OnVarsText(self, event: wx.Event) -> None:
         event.Skip()
-        self.UpdateDrawItem()
+        self.ScheduleDrawItem()
 
     @with_event
     def OnDataPosition(self, event: wx.Event) -> None:
@@ -462,8 +533,11 @@ class BoardgenPanel(BasePanel):
     def UpdateDataPosition(self) -> None:
         text = self.Data.GetValue()
         text = text.replace("\n", "\r\n")
+        if not self.path_index or self.path_index.text != text:
+            # rebuilt once per text change
+            self.path_index = JsonPathIndex(text)
         pos = max(0, self.Data.GetInsertionPoint() - 1)
-        self.edit_path = jsonpath(text, pos) or ""
+        self.edit_path = self.path_index.get(pos) or ""
         if self.edit_path:
             self.Path.ChangeValue(self.edit_path.replace(".", " -> "))
         else:
@@ -513,7 +587,14 @@ class BoardgenPanel(BasePanel):
 
     @on_event
     def OnLtciClick(self) -> None:
-        self.StartWork(LtciThread())
+        if self.modified:
+            wx.MessageBox("Please save the changes first", "Information")
+            return
+        # run on a separate Core, with a copy of the already-loaded JSON files
+        core = self.CreateCore()
+        cache, core._presets = snapshot_cache(self.core)
+        core._cache = dict(cache, board_objs={}, readme={})
+        self.StartWork(LtciThread(core))
 
     @on_event
     def OnModifiedClick(self) -> None:
@@ -0,0 +1,247 @@
+#  Copyright (c) Kuba Szczodrzyński 2026-10-19.
+
+import json
+from copy import deepcopy
+from dataclasses import dataclass, field
+from logging import debug
+from threading import Condition, Thread
+from typing import Callable
+
+import markdown2
+from svgwrite import Drawing
+
+from boardgen import Core, HasVars, ReadmeWriter, V, VariantWriter
+from boardgen.draw_util import draw_shapes, get_pcb_images
+from boardgen.models import Board, Template
+from boardgen.output import hash_content
+from boardgen.shapes import Shape, ShapeGroup
+
+# JSON caches copied from the UI thread's Core for each job
+SNAPSHOT_TYPES = ["boards", "shapes", "templates"]
+# PCB keys that only affect the drawing, not the README/variant
+SHAPE_KEYS = ["front", "back", "vars", "scale", "pads", "test_pads", "drawing_hidden"]
+
+
+@dataclass
+class RenderJob:
+    generation: int
+    item_type: str
+    item_name: str
+    vars: dict
+    # snapshot of the UI Core's JSON caches and presets
+    cache: dict[str, dict] = field(repr=False)
+    presets: dict = field(repr=False)
+    force_list: bool = True
+    # preview tab to render ("readme"/"variant"), unless it's up to date
+    tab: str | None = None
+    # doc_key that the tab was last rendered for
+    tab_key: str | None = None
+    # edit items found while loading the item on the UI thread
+    edit_items: dict = field(default_factory=dict, repr=False)
+
+    # results
+    draw_object: Board | list[Shape] | Shape | None = None
+    svg: Drawing | None = None
+    # hash of the board manifest without shapes, and presets - see get_doc_key()
+    doc_key: str | None = None
+    # tab contents, None if not rendered
+    readme_html: str | None = None
+    variant_h: str | None = None
+    variant_c: str | None = None
+    error: Exception | None = None
+    # (type, name) of JSON files used by the build
+    loaded: list[tuple[str, str]] = field(default_factory=list)
+
+
+class RenderThread(Thread):
+    """Build and draw items in the background.
+
+    Only the most recent job is kept - submitting a job replaces any pending
+    one and makes a running one stale; stale jobs stop at the next stage
+    and their results are dropped.
+
+    Jobs of item_type "tab" only render a tab of an already built board
+    (draw_object).
+    """
+
+    core: Core
+    on_done: Callable[[RenderJob], None]
+    generation: int = 0
+    pending: RenderJob | None = None
+
+    def __init__(self, core: Core, on_done: Callable[[RenderJob], None]) -> None:
+        super().__init__(daemon=True)
+        self.core = core
+        self.core.is_libretiny = True
+        self.core.json_hook = self.OnJsonLoad
+        self.on_done = on_done
+        self.condition = Condition()
+        self.job = None
+        self.running = True
+        # README fragments are keyed by their inputs, keep them between jobs
+        self.readme_cache = {}
+
+    def NextGeneration(self) -> int:
+        with self.condition:
+            self.generation += 1
+            return self.generation
+
+    def Submit(self, job: RenderJob) -> None:
+        with self.condition:
+            self.generation = max(self.generation, job.generation)
+            self.pending = job
+            self.condition.notify()
+
+    def Cancel(self) -> None:
+        with self.condition:
+            self.generation += 1
+            self.pending = None
+
+    def Stop(self) -> None:
+        with self.condition:
+            self.running = False
+            self.pending = None
+            self.condition.notify()
+
+    def IsBusy(self) -> bool:
+        with self.condition:
+            return self.pending is not None or self.job is not None
+
+    def IsStale(self, job: RenderJob) -> bool:
+        return not self.running or job.generation != self.generation
+
+    def OnJsonLoad(self, type: str, name: str, *_) -> None:
+        if self.job:
+            self.job.loaded.append((type, name))
+
+    def run(self) -> None:
+        while True:
+            with self.condition:
+                while self.running and not self.pending:
+                    self.condition.wait()
+                if not self.running:
+                    return
+                job, self.pending = self.pending, None
+                self.job = job
+            try:
+                self.Build(job)
+            except Exception as e:
+                job.error = e
+            finally:
+                self.job = None
+            if self.IsStale(job):
+                debug(f"Render job {job.generation} cancelled")
+                continue
+            self.on_done(job)
+
+    def Build(self, job: RenderJob) -> None:
+        if job.item_type == "tab":
+            self.RenderTab(job)
+            return
+        core = self.core
+        core._cache = dict(job.cache, board_objs={}, readme=self.readme_cache)
+        core._presets = job.presets
+        parent = HasVars(vars=job.vars)
+
+        match job.item_type:
+            case "boards":
+                job.draw_object = core.get_board(job.item_name)
+                job.doc_key = get_doc_key(core.load_board(job.item_name), job.presets)
+
+            case "templates":
+                front: list[Shape] = []
+                back: list[Shape] = []
+                template = Template(**core.load_template(job.item_name))
+                for data in template.front:
+                    front.append(core.build_shape(parent=parent, data=data))
+                for data in template.back:
+                    back.append(core.build_shape(parent=parent, data=data))
+                if front and back:
+                    job.draw_object = [
+                        ShapeGroup.wrap(core, job.item_name, front),
+                        ShapeGroup.wrap(core, job.item_name, back),
+                    ]
+                elif front:
+                    job.draw_object = ShapeGroup.wrap(core, job.item_name, front)
+                elif back:
+                    job.draw_object = ShapeGroup.wrap(core, job.item_name, back)
+
+            case "shapes":
+                shapes: list[Shape] = []
+                for data in core.load_shape(job.item_name):
+                    shapes.append(core.build_shape(parent=parent, data=data))
+                job.draw_object = ShapeGroup.wrap(core, job.item_name, shapes)
+
+        if self.IsStale(job):
+            return
+        self.Draw(job)
+        if job.tab and job.doc_key != job.tab_key and not self.IsStale(job):
+            self.RenderTab(job)
+
+    def Draw(self, job: RenderJob) -> None:
+        debug(f"Draw object: {job.draw_object}")
+        scale = 12
+
+        match job.draw_object:
+            case Board():
+                board = job.draw_object
+                images = get_pcb_images(self.core, board.pcb, with_labels=True)
+                if board.pcb.scale is not None:
+                    scale = board.pcb.scale
+
+            case list():
+                images = job.draw_object
+
+            case Shape():
+                images = [job.draw_object]
+
+            case _:
+                return
+
+        if images and not self.IsStale(job):
+            job.svg = draw_shapes(V(1024, 500), scale, images, with_canvas=False)
+
+    def RenderTab(self, job: RenderJob) -> None:
+        board = job.draw_object
+        if not isinstance(board, Board):
+            return
+        if job.tab == "readme":
+            readme = ReadmeWriter(self.core)
+            readme.write(board=board)
+            readme_html = markdown2.markdown(
+                text=readme.to_string(),
+                extras=[
+                    "fenced-code-blocks",
+                    "tables",
+                ],
+            )
+            job.readme_html = readme_html.replace("<table", "<table border=1")
+        elif job.tab == "variant":
+            writer = VariantWriter(self.core)
+            writer.generate(board=board)
+            job.variant_h = writer.format_sections()
+            job.variant_c = writer.format_pins()
+
+
+def get_doc_key(manifest: dict, presets: dict) -> str:
+    """Hash the parts of a board manifest used by the README/variant
+    writers (and the presets, which are edited as 'res' items), so that
+    edits of shapes only don't invalidate them.
+    """
+    manifest = dict(manifest)
+    if "pcb" in manifest:
+        manifest["pcb"] = {
+            k: v for k, v in manifest["pcb"].items() if k not in SHAPE_KEYS
+        }
+    return hash_content(
+        json.dumps(manifest, sort_keys=True, default=str)
+        + json.dumps(presets, sort_keys=True, default=str)
+    )
+
+
+def snapshot_cache(core: Core) -> tuple[dict[str, dict], dict]:
+    """Copy the Core's JSON caches (with unsaved edits) and presets,
+    for use by the render thread.
+    """
+    cache = {type: deepcopy(core._cache[type]) for type in SNAPSHOT_TYPES}
+    return cache, deepcopy(core.presets)
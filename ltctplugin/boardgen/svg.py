@@ -7,13 +7,24 @@ from svgwrite.base import BaseElement
 from svgwrite.container import Group
 from svgwrite.text import Text
 
+# (text, x, y, font size, font family, color) - in viewBox units
+SvgText = tuple[str, float, float, float, str, str]
+
 
 class SvgPanel(wx.Control):
     Svg: Drawing | None = None
+    Content: str | None = None
     Image: wx.svg.SVGimage | None = None
+    # text draw list of the current drawing
+    Texts: list[SvgText] = None
+    # rendered image and its (revision, width, height, scale)
+    Bitmap: wx.Bitmap | None = None
+    BitmapKey: tuple | None = None
+    revision: int = 0
 
     def __init__(self, *args, **kw):
         super().__init__(*args, **kw)
+        self.Texts = []
         self.Bind(wx.EVT_PAINT, self.OnPaint)
         self.Bind(wx.EVT_SIZE, self.OnSize)
         self.Bind(wx.EVT_ERASE_BACKGROUND, self.OnEraseBackground)
@@ -21,11 +32,23 @@ class SvgPanel(wx.Control):
 
     def ClearSvg(self) -> None:
         self.Image = None
+        self.Bitmap = None
+        self.revision += 1
         self.Refresh(False)
 
     def LoadSvg(self, svg: Drawing) -> None:
+        content = svg.tostring()
+        if self.Image and content == self.Content:
+            # same drawing - keep the rendered bitmap
+            self.Svg = svg
+            return
         self.Svg = svg
-        self.Image = wx.svg.SVGimage.CreateFromBytes(svg.tostring().encode())
+        self.Content = content
+        self.Image = wx.svg.SVGimage.CreateFromBytes(content.encode())
+        self.Texts = []
+        self.BuildSvgText(svg.elements)
+        self.Bitmap = None
+        self.revision += 1
         self.Refresh(False)
 
     def OnPaint(self, event) -> None:
@@ -33,7 +56,7 @@ class SvgPanel(wx.Control):
         dc = wx.BufferedPaintDC(self)
         dc.Clear()
 
-        if not self.Image:
+        if not self.Image or size.width <= 0 or size.height <= 0:
             return
 
         # calculate svg -> viewport scale
@@ -41,28 +64,36 @@ class SvgPanel(wx.Control):
         imgdim = max(self.Image.width, self.Image.height)
         scale = dcdim / imgdim
 
+        key = (self.revision, size.width, size.height, scale)
+        if self.BitmapKey != key or not self.Bitmap:
+            self.Bitmap = self.RenderBitmap(size, scale)
+            self.BitmapKey = key
+        dc.DrawBitmap(self.Bitmap, 0, 0)
+
+    def RenderBitmap(self, size: wx.Size, scale: float) -> wx.Bitmap:
+        bitmap = wx.Bitmap(size.width, size.height)
+        dc = wx.MemoryDC(bitmap)
+        dc.SetBackground(wx.Brush(self.GetBackgroundColour()))
+        dc.Clear()
+
         r: wx.GraphicsRenderer = wx.GraphicsRenderer.GetDirect2DRenderer()
         ctx: wx.GraphicsContext = r.CreateContext(dc)
         self.Image.RenderToGC(ctx, scale)
 
-        if not self.Svg:
-            return
-
-        # adjust scale for viewBox units
-        _, _, vb_width, vb_height = self.Svg["viewBox"].split(",")
-        scale *= self.Image.width / float(vb_width)
+        if self.Svg:
+            # adjust scale for viewBox units
+            _, _, vb_width, vb_height = self.Svg["viewBox"].split(",")
+            scale *= self.Image.width / float(vb_width)
+            self.DrawSvgText(ctx, scale)
 
-        self.DrawSvgText(ctx, self.Svg.elements, scale)
+        del ctx
+        dc.SelectObject(wx.NullBitmap)
+        return bitmap
 
-    def DrawSvgText(
-        self,
-        ctx: wx.GraphicsContext,
-        elements: list[BaseElement],
-        scale: float = 1.0,
-    ) -> None:
+    def BuildSvgText(self, elements: list[BaseElement]) -> None:
         for element in elements:
             if isinstance(element, Group):
-                self.DrawSvgText(ctx, element.elements)
+                self.BuildSvgText(element.elements)
                 continue
             if not isinstance(element, Text):
                 continue
@@ -78,14 +109,27 @@ class SvgPanel(wx.Control):
             else:
                 text_y -= text_size
 
+            self.Texts.append(
+                (
+                    element.text,
+                    text_x,
+                    text_y,
+                    text_size,
+                    element.attribs["font-family"],
+                    element.attribs["fill"],
+                )
+            )
+
+    def DrawSvgText(self, ctx: wx.GraphicsContext, scale: float = 1.0) -> None:
+        for text, text_x, text_y, text_size, facename, color in self.Texts:
             font: wx.GraphicsFont = ctx.CreateFont(
                 sizeInPixels=text_size * scale,
-                facename=element.attribs["font-family"],
-                col=element.attribs["fill"],
+                facename=facename,
+                col=color,
             )
             ctx.SetFont(font)
             ctx.DrawText(
-                str=element.text,
+                str=text,
                 x=text_x * scale,
                 y=text_y * scale,
             )
@@ -1,116 +1,146 @@
 #  Copyright (c) Kuba Szczodrzyński 2023-6-3.
 
 import json
+import re
+from bisect import bisect_left
 
 from ltchiptool.util.dict import get
 
-MARKER = "\ufffc"
 LF = "\n"
+RE_TOKEN = re.compile(
+    r"[ \t\r\n]*(?:"
+    r'("(?:[^"\\\x00-\x1f]|\\(?:["\\/bfnrt]|u[0-9a-fA-F]{4}))*")'
+    r"|(-?(?:0|[1-9][0-9]*)(?:\.[0-9]+)?(?:[eE][+-]?[0-9]+)?|true|false|null)"
+    r"|([{}\[\]:,]))"
+)
+RE_SPACE = re.compile(r"[ \t\r\n]*")
 
 
-def find_marker(obj: dict | list) -> str | None:
-    if isinstance(obj, dict):
-        for key, value in obj.items():
-            if MARKER in key:
-                return key.replace(MARKER, "")
-            if isinstance(value, (dict, list)):
-                ret = find_marker(value)
-                if ret:
-                    return f"{key}.{ret}"
-            if isinstance(value, str) and MARKER in value:
-                return key
-    elif isinstance(obj, list):
-        for key, value in enumerate(obj):
-            if isinstance(value, (dict, list)):
-                ret = find_marker(value)
-                if ret:
-                    return f"{key}.{ret}"
-            if isinstance(value, str) and MARKER in value:
-                return str(key)
-    return None
+class JsonPathIndex:
+    """Index of JSON string offsets to their paths, built in a single pass.
+
+    Strings (keys and values) are stored as sorted (start, end) intervals,
+    so that finding the path at an offset is a binary search.
+    """
+
+    text: str
+    # offsets of the opening/closing quotes (exclusive)
+    starts: list[int]
+    ends: list[int]
+    paths: list[str]
+
+    def __init__(self, text: str) -> None:
+        self.text = text
+        self.starts = []
+        self.ends = []
+        self.paths = []
+        try:
+            self._parse()
+        except ValueError:
+            # invalid JSON - no paths
+            self.starts, self.ends, self.paths = [], [], []
+
+    def _add(self, start: int, end: int, path: str) -> None:
+        self.starts.append(start)
+        self.ends.append(end)
+        self.paths.append(path)
+
+    def _parse(self) -> None:
+        text = self.text
+        # [is_dict, path, key or index]
+        stack: list[list] = []
+        expect = "value"
+        pos = 0
+
+        def join(key: str | int) -> str:
+            path = stack[-1][1]
+            return f"{path}.{key}" if path else str(key)
+
+        while match := RE_TOKEN.match(text, pos):
+            pos = match.end()
+            string, literal, punct = match.groups()
+            top = stack[-1] if stack else None
+
+            if expect in ("key", "key_or_end") and string:
+                top[2] = json.loads(string)
+                self._add(match.start(1), match.end(1), join(top[2]))
+                expect = "colon"
+            elif expect == "key_or_end" and punct == "}":
+                stack.pop()
+                expect = "next" if stack else "eof"
+            elif expect == "colon" and punct == ":":
+                expect = "value"
+            elif expect in ("value", "value_or_end") and (string or literal):
+                if string and top:
+                    self._add(match.start(1), match.end(1), join(top[2]))
+                expect = "next" if stack else "eof"
+            elif expect in ("value", "value_or_end") and punct in ("{", "["):
+                path = join(top[2]) if top else ""
+                if punct == "{":
+                    stack.append([True, path, None])
+                    expect = "key_or_end"
+                else:
+                    stack.append([False, path, 0])
+                    expect = "value_or_end"
+            elif expect == "value_or_end" and punct == "]":
+                stack.pop()
+                expect = "next" if stack else "eof"
+            elif expect == "next" and punct == ",":
+                if top[0]:
+                    expect = "key"
+                else:
+                    top[2] += 1
+                    expect = "value"
+            elif expect == "next" and punct == ("}" if top[0] else "]"):
+                stack.pop()
+                expect = "next" if stack else "eof"
+            else:
+                raise ValueError(f"Unexpected token at {match.start()}")
+
+        if expect != "eof" or RE_SPACE.match(text, pos).end() != len(text):
+            raise ValueError(f"Unexpected token at {pos}")
+
+    def find(self, p: int) -> str | None:
+        """Path of the string containing offset p (between quotes)."""
+        i = bisect_left(self.starts, p) - 1
+        if i >= 0 and p < self.ends[i]:
+            return self.paths[i]
+        return None
+
+    def find_nearest(self, p: int, start: int, end: int) -> str | None:
+        # nearest quote between start and end - inside the string it ends
+        # (before p) or starts (after p)
+        q = self.text.rfind('"', start, p)
+        r = self.text.find('"', p, end)
+        if q == -1 and r == -1:
+            return None
+        dist_before = p - q if q != -1 else len(self.text)
+        dist_after = r - p + 1 if r != -1 else len(self.text)
+        if dist_before <= dist_after:
+            return self.find(q)
+        return self.find(r + 1)
+
+    def get(self, p: int) -> str | None:
+        """Path at offset p; outside of strings, the path of the nearest
+        string on the same line (or in the document) is returned.
+        """
+        if not self.paths:
+            return None
+        path = self.find(p)
+        if path is not None:
+            return path
+        line_start = self.text.rfind(LF, 0, p) + 1
+        line_end = self.text.find(LF, p)
+        if line_end == -1:
+            line_end = len(self.text)
+        path = self.find_nearest(p, line_start, line_end)
+        if path is not None:
+            return path
+        return self.find_nearest(p, 0, len(self.text))
 
 
 def jsonpath(s: str, p: int) -> str | None:
-    before = s[0:p]
-    after = s[p:]
-    if (
-        before.endswith("\\")
-        and after.startswith("\\")
-        and not before.endswith("\\\\")
-        and not after.startswith("\\\\")
-    ):
-        p -= 1
-        before = s[0:p]
-        after = s[p:]
-    try:
-        # try deserializing with added marker
-        s = before + MARKER + after
-        # print(s)
-        obj = json.loads(s)
-        return find_marker(obj)
-    except json.JSONDecodeError:
-        pass
-
-    before, _, line_start = before.rpartition(LF)
-    line_end, _, after = after.partition(LF)
-    try:
-        dist_start = len(line_start) - line_start.rindex('"')
-    except ValueError:
-        dist_start = len(s)
-    try:
-        dist_end = line_end.index('"') + 1
-    except ValueError:
-        dist_end = len(s)
-    if dist_start <= dist_end:
-        s = (
-            before
-            + LF
-            + line_start[:-dist_start]
-            + MARKER
-            + line_start[-dist_start:]
-            + line_end
-            + LF
-            + after
-        )
-    elif dist_end < dist_start:
-        s = (
-            before
-            + LF
-            + line_start
-            + line_end[:dist_end]
-            + MARKER
-            + line_end[dist_end:]
-            + LF
-            + after
-        )
-    try:
-        # print(s)
-        obj = json.loads(s)
-        return find_marker(obj)
-    except json.JSONDecodeError:
-        pass
-
-    before = before + LF + line_start
-    after = line_end + LF + after
-    try:
-        dist_before = len(before) - before.rindex('"')
-    except ValueError:
-        dist_before = len(s)
-    try:
-        dist_after = after.index('"') + 1
-    except ValueError:
-        dist_after = len(s)
-    if dist_before <= dist_after:
-        s = before[:-dist_before] + MARKER + before[-dist_before:] + after
-    elif dist_after < dist_before:
-        s = before + after[:dist_after] + MARKER + after[dist_after:]
-    try:
-        # print(s)
-        obj = json.loads(s)
-        return find_marker(obj)
-    except json.JSONDecodeError:
-        pass
-    return None
+    return JsonPathIndex(s).get(p)
 
 
 def jsonwalk(obj: dict | list, path: str) -> tuple[dict | list, str | int] | None:
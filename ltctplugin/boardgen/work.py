@@ -1,15 +1,22 @@
 #  Copyright (c) Kuba Szczodrzyński 2023-11-14.
 
 import sys
-from logging import info
+from logging import debug, info
 from pathlib import Path
 
 from ltchiptool.gui.work.base import BaseThread
 from ltchiptool.util.cli import run_subprocess
 from ltchiptool.util.lvm import LVM, LVMPlatform
 
+from boardgen import BoardGenerator, Core
+
 
 class LtciThread(BaseThread):
+    def __init__(self, core: Core):
+        super().__init__()
+        # a Core seeded with the GUI's caches - boards are not loaded again
+        self.core = core
+
     def run_impl(self):
         lvm = LVM.get()
         platform = lvm.default()
@@ -30,13 +37,20 @@ class LtciThread(BaseThread):
             cwd=platform.path,
         ):
             return
-
-        info(f"Executing 'boardgen ltci' in {platform.path}")
-        if run_subprocess(
-            sys.executable,
-            "-m",
-            "boardgen",
-            "ltci",
-            cwd=platform.path,
-        ):
+        if not self.should_run():
             return
+
+        info(f"Generating board files in {platform.path}")
+        self.core.is_libretiny = True
+        generator = BoardGenerator(
+            self.core,
+            log=debug,
+            on_progress=self.on_progress,
+            should_run=self.should_run,
+        )
+        if generator.ltci(root=platform.path):
+            info("Board files generated")
+
+    @staticmethod
+    def on_progress(i: int, total: int, name: str) -> None:
+        info(f"Generating '{name}' ({i + 1}/{total})")